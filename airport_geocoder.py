@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_session import http_get
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+
+
+class AirportGeocoder:
+    """
+    Airport coordinate lookups backed by a persistent SQLite cache
+
+    Keys are airport names or codes, normalized to lowercase. Found
+    coordinates are kept indefinitely; names Nominatim could not resolve
+    are cached as misses for negative_ttl seconds so they are not retried
+    on every map render. Request failures are not cached.
+    """
+
+    def __init__(self, db_path, negative_ttl=7 * 24 * 3600, user_agent='OSINT-Dashboard/1.0'):
+        self.db_path = db_path
+        self.negative_ttl = negative_ttl
+        self.user_agent = user_agent
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS coordinates ("
+                "key TEXT PRIMARY KEY, "
+                "lat REAL, "
+                "lon REAL, "
+                "found INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def normalize(name):
+        return ' '.join(str(name).split()).lower()
+
+    def lookup(self, name):
+        """
+        Check the cache without touching the network
+
+        Returns:
+        - (True, (lat, lon)) for a cached hit, (True, None) for a cached miss,
+          (False, None) when the name has not been looked up yet
+        """
+        key = self.normalize(name)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._connection.execute(
+                    "SELECT lat, lon, found, updated_at FROM coordinates WHERE key = ?", (key,)
+                ).fetchone()
+                if entry is not None:
+                    self._memory[key] = entry
+
+        if entry is None:
+            return False, None
+
+        lat, lon, found, updated_at = entry
+        if found:
+            return True, (lat, lon)
+        if time.time() - updated_at < self.negative_ttl:
+            return True, None
+        return False, None
+
+    def store(self, name, coords):
+        key = self.normalize(name)
+        if coords:
+            entry = (float(coords[0]), float(coords[1]), 1, time.time())
+        else:
+            entry = (None, None, 0, time.time())
+
+        with self._lock, self._connection:
+            self._memory[key] = entry
+            self._connection.execute(
+                "INSERT OR REPLACE INTO coordinates (key, lat, lon, found, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key,) + entry
+            )
+
+    def search_nominatim(self, name):
+        """
+        Free-text Nominatim search for an airport
+
+        Raises on request failures so they are not cached as misses.
+        """
+        params = {
+            'q': f"{name} airport",
+            'format': 'json',
+            'limit': 1
+        }
+        response = http_get(NOMINATIM_URL, headers={'User-Agent': self.user_agent}, params=params)
+        response.raise_for_status()
+
+        data = response.json()
+        if data:
+            return float(data[0]['lat']), float(data[0]['lon'])
+        return None
+
+    def geocode(self, name):
+        found, coords = self.lookup(name)
+        if found:
+            return coords
+
+        print(f"Searching for coordinates of: {name} airport")
+        coords = self.search_nominatim(name)
+        self.store(name, coords)
+        return coords
+
+    def iter_geocode(self, names, max_workers=4):
+        """
+        Resolve many airport names, yielding each one as soon as it is known
+
+        Names are deduplicated and cached entries are yielded first. Misses
+        are looked up concurrently; the shared HTTP pool's per-host rate
+        limit keeps Nominatim at its allowed request rate. A failed lookup
+        yields None for that name and is not cached.
+
+        Yields:
+        - (name, (lat, lon) or None)
+        """
+        misses = []
+        seen = set()
+        for name in names:
+            if name in seen:
+                continue
+            seen.add(name)
+
+            found, coords = self.lookup(name)
+            if found:
+                yield name, coords
+            else:
+                misses.append(name)
+
+        if not misses:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="geocode") as executor:
+            futures = {executor.submit(self.geocode, name): name for name in misses}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    coords = future.result()
+                except Exception as e:
+                    print(f"Error getting coordinates for {name}: {e}")
+                    coords = None
+                yield name, coords
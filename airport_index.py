@@ -0,0 +1,93 @@
+import csv
+import os
+import threading
+
+import numpy as np
+
+import config
+
+
+class AirportIndex:
+    """
+    Offline airport reference index built from the bundled dataset
+
+    Columns are held as parallel arrays, with dicts mapping IATA and ICAO
+    codes and lowercase city names to row positions. Rows
+    for a city keep the dataset order, so the first one is the city's
+    primary airport.
+    """
+
+    def __init__(self, rows=()):
+        rows = list(rows)
+        self.iata = np.array([row['iata'].strip().upper() for row in rows], dtype=object)
+        self.icao = np.array([row['icao'].strip().upper() for row in rows], dtype=object)
+        self.name = np.array([row['name'].strip() for row in rows], dtype=object)
+        self.city = np.array([row['city'].strip() for row in rows], dtype=object)
+        self.country = np.array([row['country'].strip().upper() for row in rows], dtype=object)
+        self.latitude = np.array([float(row['latitude']) for row in rows], dtype=np.float64)
+        self.longitude = np.array([float(row['longitude']) for row in rows], dtype=np.float64)
+
+        self._by_code = {}
+        self._by_city = {}
+        for position in range(len(rows)):
+            if self.icao[position]:
+                self._by_code.setdefault(self.icao[position], position)
+            if self.iata[position]:
+                self._by_code[self.iata[position]] = position
+            self._by_city.setdefault(self._normalize(self.city[position]), []).append(position)
+
+    def __len__(self):
+        return len(self.iata)
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls(csv.DictReader(f))
+
+    @staticmethod
+    def _normalize(text):
+        return ' '.join(str(text).split()).lower()
+
+    def position(self, code):
+        """Row position for an IATA or ICAO code, or None"""
+        if not isinstance(code, str):
+            return None
+        return self._by_code.get(code.strip().upper())
+
+    def coordinates(self, code):
+        position = self.position(code)
+        if position is None:
+            return None
+        return float(self.latitude[position]), float(self.longitude[position])
+
+    def iata_for_city(self, city_name):
+        """
+        Primary IATA code for a city
+
+        A trailing qualifier such as a state or "DC" is dropped if the full
+        name is unknown, so "Washington DC" resolves like "Washington".
+        """
+        key = self._normalize(city_name)
+        positions = self._by_city.get(key)
+        if not positions and ' ' in key:
+            positions = self._by_city.get(key.rsplit(' ', 1)[0])
+        if not positions:
+            return None
+        return self.iata[positions[0]]
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_airport_index():
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), config.AIRPORT_DATASET)
+            try:
+                _shared_index = AirportIndex.from_csv(path)
+            except Exception as e:
+                print(f"Error loading airport dataset {path}: {e}")
+                _shared_index = AirportIndex()
+        return _shared_index
@@ -16,6 +16,14 @@ from government_data import GovernmentDataClient
 from flight_data import FlightDataClient
 from data_visualization import DataVisualization
 from reddit_api import RedditClient
+from background_tasks import BackgroundTaskRunner
+from response_cache import get_shared_cache
+from http_session import get_http_pool
+from airport_geocoder import AirportGeocoder
+from airport_index import get_airport_index
+from route_map import RouteMapLayer, get_map_background_cache
+from route_network import RouteNetwork, aggregate_routes
+from news_dedup import cluster_articles, dedupe_articles
 import config
 
 ctk.set_appearance_mode(config.APPEARANCE_MODE)
@@ -30,6 +38,10 @@ class App(ctk.CTk):
         
         self.init_clients()
         
+        self.task_runner = BackgroundTaskRunner(max_workers=config.BACKGROUND_WORKERS)
+        self.after(config.TASK_POLL_INTERVAL, self.poll_background_tasks)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         self.tabview = ctk.CTkTabview(self, width=1160, height=760)
         self.tabview.pack(padx=20, pady=20)
         
@@ -73,6 +85,61 @@ class App(ctk.CTk):
         except Exception as e:
             print(f"Error initializing Flight Data client: {e}")
             self.flight_client = None
+        
+        try:
+            self.airport_geocoder = AirportGeocoder(
+                os.path.join(os.getcwd(), config.DATA_DIR, config.GEOCODE_CACHE_DB),
+                negative_ttl=config.GEOCODE_NEGATIVE_TTL
+            )
+        except Exception as e:
+            print(f"Error initializing airport geocoder: {e}")
+            self.airport_geocoder = None
+        
+        self.airport_index = get_airport_index()
+    
+    def poll_background_tasks(self):
+        self.task_runner.process_pending()
+        self.after(config.TASK_POLL_INTERVAL, self.poll_background_tasks)
+    
+    def run_in_background(self, channel, task, on_success, error_prefix, loading_label=None, on_done=None,
+                          on_partial=None):
+        def show_progress(message):
+            if not isinstance(message, str):
+                if on_partial:
+                    on_partial(message)
+                return
+            if loading_label is not None and loading_label.winfo_exists():
+                loading_label.configure(text=message)
+        
+        def show_result(result):
+            try:
+                on_success(result)
+            finally:
+                if on_done:
+                    on_done()
+        
+        def show_failure(error):
+            if loading_label is not None and loading_label.winfo_exists():
+                loading_label.destroy()
+            if on_done:
+                on_done()
+            self.show_error(f"{error_prefix}: {error}")
+        
+        return self.task_runner.submit(
+            task,
+            on_success=show_result,
+            on_error=show_failure,
+            on_progress=show_progress,
+            channel=channel
+        )
+    
+    def on_close(self):
+        self.cancel_flight_poll()
+        self.cancel_news_watch()
+        self.task_runner.shutdown()
+        get_http_pool().close()
+        print(f"Response cache stats: {get_shared_cache().stats()}")
+        self.destroy()
     
     def setup_news_tab(self):
         header = ctk.CTkLabel(self.tab_news, text="News API Dashboard", font=ctk.CTkFont(size=20, weight="bold"))
@@ -137,13 +204,32 @@ class App(ctk.CTk):
         days_slider.grid(row=1, column=1, columnspan=2, padx=10, pady=10, sticky="ew")
         
         self.date_range_label = ctk.CTkLabel(control_frame, text="")
-        self.date_range_label.grid(row=1, column=3, columnspan=2, padx=10, pady=10, sticky="w")
+        self.date_range_label.grid(row=1, column=3, padx=10, pady=10, sticky="w")
         
         self.update_date_range_label(self.news_days_back_var.get())
         
+        max_articles_label = ctk.CTkLabel(control_frame, text="Max Articles:")
+        max_articles_label.grid(row=1, column=4, padx=10, pady=10)
+        
+        # Options past the plan's result ceiling would return no more articles
+        max_articles_options = [str(count) for count in (30, 100, 250, 500, 1000) if count <= config.NEWSAPI_MAX_RESULTS]
+        self.news_max_articles_var = ctk.StringVar(value=max_articles_options[0])
+        max_articles_dropdown = ctk.CTkOptionMenu(control_frame, values=max_articles_options, variable=self.news_max_articles_var)
+        max_articles_dropdown.grid(row=1, column=5, padx=10, pady=10)
+        
         search_button = ctk.CTkButton(control_frame, text="Search News", command=self.fetch_news)
         search_button.grid(row=1, column=6, padx=20, pady=10)
         
+        self.news_watch_var = ctk.BooleanVar(value=False)
+        watch_checkbox = ctk.CTkCheckBox(
+            control_frame,
+            text=f"Watch query (check for new articles every {config.NEWS_WATCH_INTERVAL // 60000} minutes)",
+            variable=self.news_watch_var,
+            command=self.toggle_news_watch
+        )
+        watch_checkbox.grid(row=2, column=0, columnspan=4, padx=10, pady=10, sticky="w")
+        self._news_watch_job = None
+        
         self.news_content_frame = ctk.CTkFrame(self.tab_news)
         self.news_content_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
@@ -168,6 +254,8 @@ class App(ctk.CTk):
         placeholder = ctk.CTkLabel(self.news_table_frame, text="Search for news to see results")
         placeholder.pack(pady=50)
         
+        self.news_partial_frame = None
+        
         chart_placeholder = ctk.CTkLabel(self.news_chart_frame, text="Source distribution will appear here")
         chart_placeholder.pack(pady=50)
         
@@ -471,12 +559,49 @@ class App(ctk.CTk):
         fetch_button = ctk.CTkButton(control_frame, text="Fetch Flight Data", command=self.fetch_flights)
         fetch_button.grid(row=1, column=5, padx=20, pady=10)
         
+        history_label = ctk.CTkLabel(control_frame, text="History Days:")
+        history_label.grid(row=2, column=0, padx=10, pady=10)
+        
+        self.flight_history_days_var = ctk.StringVar(value="1")
+        history_dropdown = ctk.CTkOptionMenu(control_frame, values=["1", "3", "7", "14", "30"], variable=self.flight_history_days_var)
+        history_dropdown.grid(row=2, column=1, padx=10, pady=10)
+        
+        self.flight_poll_var = ctk.BooleanVar(value=False)
+        poll_switch = ctk.CTkSwitch(control_frame, text="Live Poll", variable=self.flight_poll_var, command=self.toggle_flight_poll)
+        poll_switch.grid(row=2, column=2, padx=10, pady=10)
+        
+        sync_button = ctk.CTkButton(control_frame, text="Sync Catalog", command=self.sync_reference_catalog)
+        sync_button.grid(row=2, column=3, padx=10, pady=10)
+        
+        self._flight_poll_job = None
+        self.flight_changes_frame = None
+        self.flight_changes = pd.DataFrame()
+        self.route_network = RouteNetwork()
+        self.flight_network_frame = None
+        
+        self.flight_quota_label = ctk.CTkLabel(control_frame, text="")
+        self.flight_quota_label.grid(row=0, column=4, columnspan=2, padx=10, pady=10)
+        self.update_flight_quota_label()
+        
         self.flight_content_frame = ctk.CTkFrame(self.tab_flights)
         self.flight_content_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         placeholder = ctk.CTkLabel(self.flight_content_frame, text="Select data type and fetch to see results")
         placeholder.pack(pady=50)
     
+    def update_flight_quota_label(self):
+        if not self.flight_client:
+            return
+        
+        try:
+            status = self.flight_client.quota_status()
+            self.flight_quota_label.configure(
+                text=f"API budget: {status['remaining']} of {status['budget']} calls left ({status['month']})",
+                text_color="red" if status['exhausted'] else ctk.ThemeManager.theme["CTkLabel"]["text_color"]
+            )
+        except Exception as e:
+            print(f"Error reading API quota status: {e}")
+    
     def auto_save(self, data, module_name, format="csv"):
         try:
             if data is None or data.empty:
@@ -525,9 +650,14 @@ class App(ctk.CTk):
             to_date = datetime.now().date().strftime("%Y-%m-%d")
             days_back = self.news_days_back_var.get()
             from_date = (datetime.now().date() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+            max_articles = int(self.news_max_articles_var.get())
+            watching = bool(query) and self.news_watch_var.get()
+            
+            self.cancel_news_watch()
             
             for widget in self.news_table_frame.winfo_children():
                 widget.destroy()
+            self.news_partial_frame = None
             
             for widget in self.news_chart_frame.winfo_children():
                 widget.destroy()
@@ -544,41 +674,119 @@ class App(ctk.CTk):
             
             date_info = f" ({from_date} to {to_date})"
             
-            if query:
-                if title_only:
-                    news_data = self.news_client.get_everything_in_title(
-                        query=query, 
-                        page_size=50, 
-                        from_date=from_date, 
-                        to_date=to_date
+            def load_news(progress):
+                if watching:
+                    progress(f"Checking for new articles about '{query}'...")
+                    new_articles, news_data = self.news_client.watch_query(
+                        query,
+                        days_back=days_back,
+                        title_only=title_only
                     )
-                    title = f"Articles with '{query}' in Title{date_info}"
+                    title = f"Watching '{query}' - {len(new_articles)} new of {len(news_data)} articles"
+                    
+                    news_data = cluster_articles(news_data)
+                    if not new_articles.empty:
+                        # New wire copies of stories already stored are not saved again
+                        unique_news = dedupe_articles(news_data)
+                        self.auto_save(unique_news[unique_news['url'].isin(new_articles['url'])], "news_watch")
+                    
+                    return news_data, title
+                
+                if query:
+                    if title_only:
+                        progress(f"Searching article titles for '{query}'...")
+                        news_data = self.news_client.get_everything_in_title(
+                            query=query, 
+                            page_size=min(max_articles, 100), 
+                            from_date=from_date, 
+                            to_date=to_date
+                        )
+                        title = f"Articles with '{query}' in Title{date_info}"
+                    else:
+                        progress(f"Searching articles for '{query}'...")
+                        news_data = self.news_client.get_everything_paged(
+                            query=query,
+                            target_count=max_articles,
+                            from_date=from_date,
+                            to_date=to_date,
+                            progress_callback=progress
+                        )
+                        title = f"Search Results for '{query}'{date_info}"
                 else:
-                    news_data = self.news_client.get_everything(
-                        query=query, 
-                        page_size=30, 
-                        from_date=from_date, 
-                        to_date=to_date
-                    )
-                    title = f"Search Results for '{query}'{date_info}"
-            else:
-                news_data = self.news_client.get_top_headlines(country=country, category=category, page_size=30)
-                title = "Top Headlines"
-                if category:
-                    title += f" - {category.capitalize()}"
-                if country:
-                    title += f" ({country.upper()})"
-            
+                    progress("Loading top headlines...")
+                    news_data = self.news_client.get_top_headlines(country=country, category=category, page_size=30)
+                    title = "Top Headlines"
+                    if category:
+                        title += f" - {category.capitalize()}"
+                    if country:
+                        title += f" ({country.upper()})"
+                
+                news_data = cluster_articles(news_data)
+                if not news_data.empty:
+                    self.auto_save(dedupe_articles(news_data), "news")
+                
+                return news_data, title
+            
+            self.run_in_background(
+                "news",
+                load_news,
+                lambda result: self._show_news(*result, date_info, loading_label),
+                "Error fetching news",
+                loading_label,
+                on_partial=lambda partial_data: self._show_partial_news(partial_data, loading_label),
+                on_done=self.schedule_news_watch if watching else None
+            )
+        
+        except Exception as e:
+            self.show_error(f"Error fetching news: {e}")
+            print(f"Error details: {str(e)}")
+            import traceback
+            traceback.print_exc()
+    
+    def toggle_news_watch(self):
+        if not self.news_watch_var.get():
+            self.cancel_news_watch()
+    
+    def cancel_news_watch(self):
+        if self._news_watch_job is not None:
+            self.after_cancel(self._news_watch_job)
+            self._news_watch_job = None
+    
+    def schedule_news_watch(self):
+        """Re-run the watched search after NEWS_WATCH_INTERVAL; each run only fetches articles newer than the last"""
+        self.cancel_news_watch()
+        if self.news_watch_var.get():
+            self._news_watch_job = self.after(config.NEWS_WATCH_INTERVAL, self.fetch_news)
+    
+    def _show_partial_news(self, partial_data, loading_label):
+        """Fill the article table with the pages that have arrived while the rest are still loading"""
+        if not loading_label.winfo_exists():
+            return
+        
+        loading_label.configure(text=f"Loading news data... ({len(partial_data)} articles so far)")
+        
+        if self.news_partial_frame is None:
+            self.news_partial_frame = ctk.CTkFrame(self.news_table_frame)
+            self.news_partial_frame.pack(fill="both", expand=True)
+        
+        for widget in self.news_partial_frame.winfo_children():
+            widget.destroy()
+        
+        display_data = partial_data.reindex(columns=['title', 'source_name', 'publishedAt'])
+        display_data.columns = ['Title', 'Source', 'Published At']
+        DataVisualization.create_data_table(display_data, self.news_partial_frame, max_rows=15)
+    
+    def _show_news(self, news_data, title, date_info, loading_label):
+        try:
             self.news_data = news_data
             
-            if not news_data.empty:
-                self.auto_save(news_data, "news")
-            
-            loading_label.destroy()
+            for widget in self.news_table_frame.winfo_children():
+                widget.destroy()
+            self.news_partial_frame = None
             
             if news_data.empty:
                 no_data_message = "No news articles found matching your criteria."
-                if from_date or to_date:
+                if date_info:
                     no_data_message += f"\nTry adjusting your date range: {date_info}"
                 
                 no_data_label = ctk.CTkLabel(self.news_table_frame, text=no_data_message)
@@ -592,18 +800,25 @@ class App(ctk.CTk):
                 
                 return
             
+            # Charts and the table count each wire story once, credited to its earliest outlet
+            unique_news = dedupe_articles(news_data)
+            duplicates = len(news_data) - len(unique_news)
+            if duplicates:
+                title += f" ({duplicates} near-duplicates merged)"
+            
             table_label = ctk.CTkLabel(self.news_table_frame, text=title, font=ctk.CTkFont(size=16, weight="bold"))
             table_label.pack(pady=10)
             
-            display_data = news_data[['title', 'source_name', 'publishedAt']].copy()
-            display_data.columns = ['Title', 'Source', 'Published At']
+            display_data = unique_news.reindex(columns=['title', 'source_name', 'publishedAt', 'copies'])
+            display_data.columns = ['Title', 'Source', 'Published At', 'Copies']
             
             DataVisualization.create_data_table(display_data, self.news_table_frame, max_rows=15)
             
             chart_label = ctk.CTkLabel(self.news_chart_frame, text="Source Distribution", font=ctk.CTkFont(size=16, weight="bold"))
             chart_label.pack(pady=10)
             
-            source_counts = news_data['source_name'].value_counts().reset_index()
+            source_counts = unique_news['source_name'].value_counts()
+            source_counts = source_counts[source_counts > 0].reset_index()
             source_counts.columns = ['Source', 'Count']
             
             if len(source_counts) > 10:
@@ -640,7 +855,7 @@ class App(ctk.CTk):
             
             if 'title' in news_data.columns:
                 DataVisualization.create_wordcloud(
-                    text_data=news_data['title'],
+                    text_data=unique_news['title'],
                     title="Word Frequency in Headlines",
                     frame=wordcloud_frame,
                     figsize=(10, 6)
@@ -706,18 +921,37 @@ class App(ctk.CTk):
             loading_label.pack(pady=50)
             self.update_idletasks()
             
-            posts_data = self.reddit_client.search_posts(
-                query=query,
-                subreddit=subreddit,
-                limit=count,
-                sort=sort_type
+            def load_posts(progress):
+                posts_data = self.reddit_client.search_posts(
+                    query=query,
+                    subreddit=subreddit,
+                    limit=count,
+                    sort=sort_type
+                )
+                
+                if not posts_data.empty:
+                    self.auto_save(posts_data, "reddit")
+                    
+                return posts_data
+                
+            self.run_in_background(
+                "reddit",
+                load_posts,
+                lambda posts_data: self._show_reddit(posts_data, query, subreddit, sort_type, loading_label),
+                "Error fetching Reddit data",
+                loading_label
             )
-            
+        
+        except Exception as e:
+            self.show_error(f"Error fetching Reddit data: {e}")
+            print(f"Error details: {str(e)}")
+            import traceback
+            traceback.print_exc()
+    
+    def _show_reddit(self, posts_data, query, subreddit, sort_type, loading_label):
+        try:
             self.reddit_data = posts_data
             
-            if not posts_data.empty:
-                self.auto_save(posts_data, "reddit")
-            
             loading_label.destroy()
             
             if posts_data.empty:
@@ -796,36 +1030,70 @@ class App(ctk.CTk):
             loading_label.pack(pady=50)
             self.update_idletasks()
             
-            if source == "FDA Food Recalls":
-                recall_limit = self.recall_limit_var.get() if hasattr(self, 'recall_limit_var') else 25
-                
-                search_term = self.recall_search_var.get() if hasattr(self, 'recall_search_var') else ""
+            recall_limit = self.recall_limit_var.get() if hasattr(self, 'recall_limit_var') else 25
+            
+            search_term = self.recall_search_var.get() if hasattr(self, 'recall_search_var') else ""
+            
+            if source == "FDA Food Recalls" and search_term:
+                loading_label.configure(text=f"Searching entire FDA database for '{search_term}'...")
+            
+            def load_government(progress):
+                title = None
                 
-                if search_term:
-                    loading_search_label = ctk.CTkLabel(self.gov_content_frame, text=f"Searching entire FDA database for '{search_term}'...")
-                    loading_search_label.pack(pady=20)
-                    self.update_idletasks()
-                    
-                    gov_data = self.gov_client.search_fda_food_recalls(search_term=search_term, max_results=recall_limit)
-                    
-                    loading_search_label.destroy()
-                    
-                    if gov_data.empty:
-                        no_results_label = ctk.CTkLabel(
-                            self.gov_content_frame, 
-                            text=f"No FDA recalls found matching '{search_term}'. Try a different search term.",
-                            font=ctk.CTkFont(size=14, weight="bold")
+                if source == "FDA Food Recalls":
+                    if search_term:
+                        gov_data = self.gov_client.search_fda_food_recalls(
+                            search_term=search_term,
+                            max_results=recall_limit,
+                            progress_callback=progress
                         )
-                        no_results_label.pack(pady=50)
-                        return
+                        title = f"FDA Food Recalls - Search: '{search_term}' ({len(gov_data)} results)"
+                    else:
+                        gov_data = self.gov_client.get_fda_food_recalls(limit=recall_limit)
+                        title = f"FDA Food Recalls ({len(gov_data)} results)"
+                    
+                    if not gov_data.empty:
+                        self.auto_save(gov_data, "fda_recalls")
+                
+                elif source == "Census Population":
+                    gov_data = self.gov_client.get_census_population_data()
+                    title = "US Census Population Data"
                     
-                    title = f"FDA Food Recalls - Search: '{search_term}' ({len(gov_data)} results)"
+                    if not gov_data.empty:
+                        self.auto_save(gov_data, "census_population")
+                
                 else:
-                    gov_data = self.gov_client.get_fda_food_recalls(limit=recall_limit)
-                    title = f"FDA Food Recalls ({len(gov_data)} results)"
+                    gov_data = pd.DataFrame()
                 
-                if not gov_data.empty:
-                    self.auto_save(gov_data, "fda_recalls")
+                return gov_data, title
+            
+            self.run_in_background(
+                "government",
+                load_government,
+                lambda result: self._show_government(source, *result, search_term, loading_label),
+                "Error fetching government data",
+                loading_label
+            )
+        
+        except Exception as e:
+            self.show_error(f"Error fetching government data: {e}")
+            print(f"Error details: {str(e)}")
+            import traceback
+            traceback.print_exc()
+    
+    def _show_government(self, source, gov_data, title, search_term, loading_label):
+        try:
+            loading_label.destroy()
+            
+            if source == "FDA Food Recalls":
+                if search_term and gov_data.empty:
+                    no_results_label = ctk.CTkLabel(
+                        self.gov_content_frame, 
+                        text=f"No FDA recalls found matching '{search_term}'. Try a different search term.",
+                        font=ctk.CTkFont(size=14, weight="bold")
+                    )
+                    no_results_label.pack(pady=50)
+                    return
                 
                 content_container = ctk.CTkFrame(self.gov_content_frame)
                 content_container.pack(fill="both", expand=True, padx=10, pady=10)
@@ -972,12 +1240,6 @@ class App(ctk.CTk):
                     no_cols_label.pack(pady=50)
                 
             elif source == "Census Population":
-                gov_data = self.gov_client.get_census_population_data()
-                title = "US Census Population Data"
-                
-                if not gov_data.empty:
-                    self.auto_save(gov_data, "census_population")
-                
                 content_container = ctk.CTkFrame(self.gov_content_frame)
                 content_container.pack(fill="both", expand=True, padx=10, pady=10)
                 
@@ -1029,8 +1291,6 @@ class App(ctk.CTk):
                     else:
                         no_cols_label = ctk.CTkLabel(chart_frame, text="Required columns not found in data.")
                         no_cols_label.pack(pady=50)
-                
-            loading_label.destroy()
             
             if gov_data.empty:
                 no_data_label = ctk.CTkLabel(self.gov_content_frame, text="No data found for the selected source.")
@@ -1074,6 +1334,15 @@ class App(ctk.CTk):
             flight_status = self.flight_status_var.get() or None
             departure_city = self.flight_city_var.get() or None
             limit = self.flight_limit_var.get()
+            history_days = int(self.flight_history_days_var.get())
+            polling = data_type == "Real-time Flights" and self.flight_poll_var.get()
+            board = {'limit': limit, 'flight_status': flight_status, 'departure_city': departure_city}
+            
+            self.cancel_flight_poll()
+            self.flight_changes_frame = None
+            self.flight_changes = pd.DataFrame()
+            self.flight_network_frame = None
+            route_network = self.route_network = RouteNetwork()
             
             for widget in self.flight_content_frame.winfo_children():
                 widget.destroy()
@@ -1082,33 +1351,111 @@ class App(ctk.CTk):
             loading_label.pack(pady=50)
             self.update_idletasks()
             
-            if data_type == "Real-time Flights":
-                print(f"Fetching flight data with: status={flight_status}, city={departure_city}, limit={limit}")
-                flight_data = self.flight_client.get_real_time_flights(
-                    limit=limit,
-                    flight_status=flight_status,
-                    departure_city=departure_city
-                )
-                print(f"API response - data rows: {len(flight_data) if not flight_data.empty else 0}")
-                print(f"Data columns: {flight_data.columns.tolist() if not flight_data.empty else 'No data'}")
+            def load_flights(progress):
+                network_metrics = None
                 
-                if not flight_data.empty:
-                    self.auto_save(flight_data, "realtime_flights")
+                if data_type == "Real-time Flights":
+                    print(f"Fetching flight data with: status={flight_status}, city={departure_city}, limit={limit}")
+                    if polling:
+                        # Live boards persist only their changes, not a full copy per poll
+                        flight_data, _ = self.flight_client.poll_flight_board(**board)
+                    else:
+                        flight_data = self.flight_client.get_real_time_flights(
+                            limit=limit,
+                            flight_status=flight_status,
+                            departure_city=departure_city
+                        )
+                    print(f"API response - data rows: {len(flight_data) if not flight_data.empty else 0}")
+                    print(f"Data columns: {flight_data.columns.tolist() if not flight_data.empty else 'No data'}")
+                    
+                    if not flight_data.empty:
+                        if not polling:
+                            self.auto_save(flight_data, "realtime_flights")
+                        route_network.add_flights(flight_data)
+                        network_metrics = route_network.airport_metrics()
+                        progress("Preparing map...")
+                        self.prepare_route_map_background()
+                    
+                    title = "Real-time Flight Data"
+                    if flight_status:
+                        title += f" - {flight_status.capitalize()} Flights"
+                    if departure_city:
+                        title += f" from {departure_city}"
                 
-                title = "Real-time Flight Data"
-                if flight_status:
-                    title += f" - {flight_status.capitalize()} Flights"
-                if departure_city:
-                    title += f" from {departure_city}"
+                elif data_type == "Airports":
+                    flight_data = self.flight_client.get_airport_data(limit=limit)
+                    
+                    if not flight_data.empty:
+                        self.auto_save(flight_data, "airports")
+                    
+                    title = f"Airport Data ({self.flight_client.get_reference_catalog().count('airports')} in local catalog)"
                 
+                elif data_type == "Airlines":
+                    flight_data = self.flight_client.get_airline_data(limit=limit)
+                    
+                    if not flight_data.empty:
+                        self.auto_save(flight_data, "airlines")
+                    
+                    title = f"Airline Data ({self.flight_client.get_reference_catalog().count('airlines')} in local catalog)"
+                
+                elif data_type == "Historical Flights":
+                    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+                    first_day = (datetime.now() - timedelta(days=history_days)).strftime('%Y-%m-%d')
+                    
+                    flight_data = self.flight_client.backfill_historical_flights(
+                        first_day,
+                        yesterday,
+                        limit=limit,
+                        max_rows_per_day=limit,
+                        progress_callback=progress
+                    )
+                    
+                    if not flight_data.empty:
+                        self.auto_save(flight_data, "historical_flights")
+                    
+                    if history_days == 1:
+                        title = f"Historical Flight Data - {yesterday}"
+                    else:
+                        title = f"Historical Flight Data - {first_day} to {yesterday}"
+                
+                else:
+                    flight_data = pd.DataFrame()
+                    title = data_type
+                
+                return flight_data, title, network_metrics
+            
+            self.run_in_background(
+                "flights",
+                load_flights,
+                lambda result: self._show_flights(data_type, *result, loading_label, poll_board=board if polling else None),
+                "Error fetching flight data",
+                loading_label,
+                on_done=self.update_flight_quota_label
+            )
+            
+        except Exception as e:
+            loading_label.destroy() if 'loading_label' in locals() else None
+            self.show_error(f"Error fetching flight data: {str(e)}")
+    
+    def _show_flights(self, data_type, flight_data, title, network_metrics, loading_label, poll_board=None):
+        try:
+            loading_label.destroy()
+            
+            if data_type == "Real-time Flights":
                 flight_tabview = ctk.CTkTabview(self.flight_content_frame, width=1120, height=650)
                 flight_tabview.pack(fill="both", expand=True, padx=10, pady=10)
                 
                 data_tab = flight_tabview.add("Flight Info")
                 map_tab = flight_tabview.add("World Map")
+                network_tab = flight_tabview.add("Route Network")
                 
                 flight_tabview.set("World Map")
                 
+                self.flight_network_frame = ctk.CTkFrame(network_tab)
+                self.flight_network_frame.pack(fill="both", expand=True, padx=10, pady=10)
+                if network_metrics is not None:
+                    self.show_route_network(network_metrics)
+                
                 content_container = ctk.CTkFrame(data_tab)
                 content_container.pack(fill="both", expand=True, padx=10, pady=10)
                 
@@ -1119,8 +1466,6 @@ class App(ctk.CTk):
                 table_title.pack(pady=10)
                 
                 if flight_data.empty:
-                    loading_label.destroy()
-                    
                     no_data_label = ctk.CTkLabel(self.flight_content_frame, 
                                                 text=f"No flight data found matching your criteria.\n"
                                                      f"Try adjusting your filters.")
@@ -1151,6 +1496,10 @@ class App(ctk.CTk):
                         
                         DataVisualization.create_data_table(display_data, table_frame, max_rows=0)
                     
+                    if poll_board is not None:
+                        self.create_flight_changes_panel(content_container)
+                        self.schedule_flight_poll(poll_board)
+                    
                     map_title = ctk.CTkLabel(map_tab, text="Flight Routes Map", font=ctk.CTkFont(size=16, weight="bold"))
                     map_title.pack(pady=10)
                     
@@ -1169,13 +1518,6 @@ class App(ctk.CTk):
                         no_map_label.pack(pady=50)
             
             elif data_type == "Airports":
-                flight_data = self.flight_client.get_airport_data(limit=limit)
-                
-                if not flight_data.empty:
-                    self.auto_save(flight_data, "airports")
-                    
-                title = "Airport Data"
-                
                 content_container = ctk.CTkFrame(self.flight_content_frame)
                 content_container.pack(fill="both", expand=True, padx=10, pady=10)
                 
@@ -1199,13 +1541,6 @@ class App(ctk.CTk):
                         no_cols_label.pack(pady=50)
             
             elif data_type == "Airlines":
-                flight_data = self.flight_client.get_airline_data(limit=limit)
-                
-                if not flight_data.empty:
-                    self.auto_save(flight_data, "airlines")
-                    
-                title = "Airline Data"
-                
                 content_container = ctk.CTkFrame(self.flight_content_frame)
                 content_container.pack(fill="both", expand=True, padx=10, pady=10)
                 
@@ -1229,19 +1564,6 @@ class App(ctk.CTk):
                         no_cols_label.pack(pady=50)
             
             elif data_type == "Historical Flights":
-                from datetime import datetime, timedelta
-                yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                
-                flight_data = self.flight_client.get_historical_flights(
-                    flight_date=yesterday,
-                    limit=limit
-                )
-                
-                if not flight_data.empty:
-                    self.auto_save(flight_data, "historical_flights")
-                    
-                title = f"Historical Flight Data - {yesterday}"
-                
                 content_container = ctk.CTkFrame(self.flight_content_frame)
                 content_container.pack(fill="both", expand=True, padx=10, pady=10)
                 
@@ -1296,18 +1618,219 @@ class App(ctk.CTk):
                         no_cols_label = ctk.CTkLabel(table_frame, text="Required columns not found in data.")
                         no_cols_label.pack(pady=50)
             
-            loading_label.destroy()
-            
         except Exception as e:
-            loading_label.destroy() if 'loading_label' in locals() else None
             self.show_error(f"Error fetching flight data: {str(e)}")
             
+    def toggle_flight_poll(self):
+        if not self.flight_poll_var.get():
+            self.cancel_flight_poll()
+    
+    def cancel_flight_poll(self):
+        if self._flight_poll_job is not None:
+            self.after_cancel(self._flight_poll_job)
+            self._flight_poll_job = None
+    
+    def schedule_flight_poll(self, board):
+        self.cancel_flight_poll()
+        self._flight_poll_job = self.after(config.FLIGHT_POLL_INTERVAL, lambda: self.poll_flight_board(board))
+    
+    def poll_flight_board(self, board):
+        """Re-fetch the live board in the background and push only the changed flights to the UI"""
+        self._flight_poll_job = None
+        if not self.flight_poll_var.get() or not self.flight_changes_frame or not self.flight_changes_frame.winfo_exists():
+            return
+        
+        route_network = self.route_network
+        
+        def load_changes(progress):
+            flight_data, changes = self.flight_client.poll_flight_board(**board)
+            network_metrics = route_network.airport_metrics() if route_network.add_flights(flight_data) else None
+            return changes, network_metrics
+        
+        def show_changes(result):
+            changes, network_metrics = result
+            if not self.flight_changes_frame or not self.flight_changes_frame.winfo_exists():
+                return
+            self._show_flight_changes(changes)
+            if network_metrics is not None:
+                self.show_route_network(network_metrics)
+            if self.flight_client.quota_status()['exhausted']:
+                self.flight_changes_status.configure(text="Live polling stopped: API budget used up")
+                return
+            self.schedule_flight_poll(board)
+        
+        self.flight_changes_status.configure(text="Polling flight board...")
+        self.run_in_background(
+            "flight_poll",
+            load_changes,
+            show_changes,
+            "Error polling flight board",
+            on_done=self.update_flight_quota_label
+        )
+    
+    def sync_reference_catalog(self):
+        if not self.flight_client:
+            self.show_error("Flight data client not initialized. Check your API key.")
+            return
+        
+        data_type = self.flight_type_var.get()
+        if data_type not in ("Airports", "Airlines"):
+            self.show_error("Select Airports or Airlines to sync its local catalog")
+            return
+        
+        table = data_type.lower()
+        
+        def sync_catalog(progress):
+            catalog = self.flight_client.sync_reference_catalog(table, progress_callback=progress)
+            return catalog.count(table) if catalog is not None else 0
+        
+        self.run_in_background(
+            "catalog_sync",
+            sync_catalog,
+            lambda count: self.show_info(f"Local {table} catalog now holds {count} records"),
+            f"Error syncing {table} catalog",
+            on_done=self.update_flight_quota_label
+        )
+    
+    def create_flight_changes_panel(self, parent_frame):
+        changes_frame = ctk.CTkFrame(parent_frame)
+        changes_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        
+        changes_title = ctk.CTkLabel(changes_frame, text="Live Changes", font=ctk.CTkFont(size=16, weight="bold"))
+        changes_title.pack(pady=5)
+        
+        minutes = config.FLIGHT_POLL_INTERVAL // 60000
+        self.flight_changes_status = ctk.CTkLabel(changes_frame, text=f"Polling every {minutes} minutes")
+        self.flight_changes_status.pack(pady=5)
+        
+        self.flight_changes_table = ctk.CTkFrame(changes_frame)
+        self.flight_changes_table.pack(fill="both", expand=True)
+        self.flight_changes_frame = changes_frame
+    
+    def _show_flight_changes(self, changes):
+        polled_at = datetime.now().strftime('%H:%M:%S')
+        self.flight_changes_status.configure(text=f"Last poll {polled_at}: {len(changes)} changed flights")
+        if changes.empty:
+            return
+        
+        self.flight_changes = pd.concat([changes, self.flight_changes], ignore_index=True).head(config.FLIGHT_CHANGES_DISPLAY_ROWS)
+        
+        columns_to_display = [
+            'detected_at', 'flight_iata', 'change', 'changed_fields', 'flight_status',
+            'departure_gate', 'departure_delay', 'arrival_delay'
+        ]
+        display_data = self.flight_changes.reindex(columns=columns_to_display)
+        display_data.columns = ['Detected', 'Flight', 'Change', 'Fields', 'Status', 'Gate', 'Dep Delay', 'Arr Delay']
+        
+        for widget in self.flight_changes_table.winfo_children():
+            widget.destroy()
+        DataVisualization.create_data_table(display_data, self.flight_changes_table, max_rows=0)
+    
+    def show_route_network(self, network_metrics):
+        """Hub ranking of the airports in the current flight board's route network"""
+        if not self.flight_network_frame or not self.flight_network_frame.winfo_exists():
+            return
+        
+        for widget in self.flight_network_frame.winfo_children():
+            widget.destroy()
+        
+        network = self.route_network
+        title = ctk.CTkLabel(
+            self.flight_network_frame,
+            text=f"Airport Hubs - {len(network_metrics)} airports, {network.graph.number_of_edges()} routes, {network.flight_count} flights",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        title.pack(pady=10)
+        
+        display_data = network_metrics.head(config.ROUTE_HUB_DISPLAY_ROWS).rename(columns={
+            'hub_rank': 'Rank',
+            'airport': 'Airport',
+            'departures': 'Departures',
+            'arrivals': 'Arrivals',
+            'flights': 'Flights',
+            'connections': 'Connections',
+            'betweenness': 'Betweenness'
+        })
+        display_data = display_data[['Rank', 'Airport', 'Departures', 'Arrivals', 'Flights', 'Connections', 'Betweenness']]
+        DataVisualization.create_data_table(display_data, self.flight_network_frame, max_rows=0)
+    
+    def resolve_route_coordinates(self, flight_data):
+        """
+        Look up route endpoints in the bundled airport index, then the synced airport catalog
+
+        Returns:
+        - (airport name -> (lat, lon), list of airport names that still need geocoding)
+        """
+        required_cols = ['departure_airport', 'arrival_airport']
+        if any(col not in flight_data.columns for col in required_cols):
+            return {}, []
+        
+        map_data = flight_data.dropna(subset=required_cols)
+        
+        airport_codes = {}
+        for role in ('departure', 'arrival'):
+            names = map_data[f'{role}_airport'].astype(str)
+            for code_col in (f'{role}_iata', f'{role}_icao'):
+                if code_col not in map_data.columns:
+                    continue
+                for name, code in zip(names, map_data[code_col]):
+                    if isinstance(code, str) and code:
+                        airport_codes.setdefault(name, []).append(code)
+        
+        unique_airports = set(map_data['departure_airport'].astype(str)) | set(map_data['arrival_airport'].astype(str))
+        unique_airports.discard("")
+        unique_airports.discard("nan")
+        
+        airport_coords = {}
+        for airport in unique_airports:
+            for code in airport_codes.get(airport, []):
+                coords = self.airport_index.coordinates(code)
+                if not coords and self.flight_client:
+                    coords = self.flight_client.catalog_airport_coordinates(code)
+                if coords:
+                    airport_coords[airport] = coords
+                    break
+        
+        missing = sorted(airport for airport in unique_airports if airport not in airport_coords)
+        print(f"Resolved {len(airport_coords)} airports from local data, {len(missing)} need geocoding")
+        
+        return airport_coords, missing
+    
+    def stream_route_geocoding(self, airports, on_resolved, on_finished):
+        """
+        Geocode airports on a worker, handing each result to on_resolved(name, coords, resolved_count)
+        on the main thread as soon as it arrives
+        """
+        def geocode_airports(progress):
+            resolved = 0
+            for name, coords in self.airport_geocoder.iter_geocode(airports, max_workers=config.GEOCODE_MAX_WORKERS):
+                resolved += 1
+                progress((name, coords, resolved))
+            return resolved
+        
+        return self.task_runner.submit(
+            geocode_airports,
+            on_success=on_finished,
+            on_error=lambda e: print(f"Error geocoding airports: {e}"),
+            on_progress=lambda payload: on_resolved(*payload),
+            channel="route_geocode"
+        )
+    
+    def get_route_map_background(self):
+        return get_map_background_cache().get(projection='robin', resolution='l', figsize=(12, 6), dpi=100)
+    
+    def prepare_route_map_background(self):
+        # Called from worker threads so the first map of a session doesn't render the background on the UI thread
+        try:
+            self.get_route_map_background()
+        except Exception as e:
+            print(f"Error preparing map background: {e}")
+    
     def create_route_map(self, flight_data, parent_frame):
         try:
             import matplotlib.pyplot as plt
             from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
             import numpy as np
-            from mpl_toolkits.basemap import Basemap
             
             required_cols = ['departure_airport', 'arrival_airport']
             
@@ -1328,49 +1851,19 @@ class App(ctk.CTk):
                 no_data_label.pack(pady=50)
                 return
             
-            loading_frame = ctk.CTkFrame(parent_frame)
-            loading_frame.pack(fill="x", padx=10, pady=5)
-            
-            loading_label = ctk.CTkLabel(
-                loading_frame, 
-                text="Fetching coordinates for airports... This may take a moment.",
-                font=ctk.CTkFont(size=12)
-            )
-            loading_label.pack(pady=5)
-            self.update_idletasks()
-            
-            airport_coords = {}
-            unique_airports = set()
-            
-            for _, flight in map_data.iterrows():
-                dep_airport = str(flight['departure_airport'])
-                arr_airport = str(flight['arrival_airport'])
-                unique_airports.add(dep_airport)
-                unique_airports.add(arr_airport)
-            
-            loading_label.configure(text=f"Fetching coordinates for {len(unique_airports)} airports...")
-            self.update_idletasks()
-            
-            for airport in unique_airports:
-                if airport and airport != "nan":
-                    coords = self.get_airport_coordinates(airport)
-                    if coords:
-                        airport_coords[airport] = coords
-                    
-                    loading_label.configure(text=f"Looking up airports... ({len(airport_coords)}/{len(unique_airports)})")
-                    self.update_idletasks()
+            airport_coords, pending_airports = self.resolve_route_coordinates(map_data)
+            if self.airport_geocoder is None:
+                pending_airports = []
             
-            if len(airport_coords) < 2:
-                loading_frame.destroy()
+            if len(airport_coords) < 2 and not pending_airports:
                 error_label = ctk.CTkLabel(
                     parent_frame, 
-                    text=f"Could not find enough airport coordinates. Found {len(airport_coords)} out of {len(unique_airports)}.",
+                    text=f"Could not find enough airport coordinates. Found {len(airport_coords)}.",
                     font=ctk.CTkFont(size=14)
                 )
                 error_label.pack(pady=50)
                 return
             
-            loading_frame.destroy()
             info_frame = ctk.CTkFrame(parent_frame)
             info_frame.pack(fill="x", padx=10, pady=5)
             
@@ -1384,78 +1877,39 @@ class App(ctk.CTk):
             fig = plt.Figure(figsize=(12, 6), dpi=100)
             ax = fig.add_subplot(111)
             
-            m = Basemap(projection='robin', lon_0=0, resolution='l', ax=ax)
+            background = self.get_route_map_background()
+            background.draw(ax)
+            m = background.basemap
             
-            m.drawcoastlines(linewidth=0.5)
-            m.drawcountries(linewidth=0.5)
-            m.fillcontinents(color='lightgray', lake_color='white')
-            m.drawmapboundary(fill_color='white')
+            route_layer = RouteMapLayer(ax, m)
             
-            m.drawparallels(np.arange(-90., 91., 30.), labels=[1, 0, 0, 0])
-            m.drawmeridians(np.arange(-180., 181., 60.), labels=[0, 0, 0, 1])
+            # One weighted edge per route rather than one line per flight
+            departures, arrivals, route_flights = aggregate_routes(
+                map_data['departure_airport'].astype(str),
+                map_data['arrival_airport'].astype(str)
+            )
+            undrawn = np.ones(len(departures), dtype=bool)
             
-            plotted_airports = set()
+            def draw_ready_routes():
+                known = np.array(list(airport_coords), dtype=object)
+                ready = undrawn & np.isin(departures, known) & np.isin(arrivals, known)
+                if not ready.any():
+                    return
+                
+                dep_coords = np.array([airport_coords[name] for name in departures[ready]])
+                arr_coords = np.array([airport_coords[name] for name in arrivals[ready]])
+                route_layer.add_routes(
+                    departures[ready], dep_coords[:, 0], dep_coords[:, 1],
+                    arrivals[ready], arr_coords[:, 0], arr_coords[:, 1],
+                    flights=route_flights[ready]
+                )
+                undrawn[ready] = False
             
-            routes_plotted = 0
+            def describe_routes(suffix=""):
+                info_label.configure(text=f"Showing {route_layer.route_count} routes ({route_layer.flight_count} flights) with {len(route_layer.plotted_airports)} airports • Blue lines connect departure (red) to arrival (green) airports, thicker for busier routes{suffix}")
             
-            for idx, flight in map_data.iterrows():
-                try:
-                    dep_airport = str(flight['departure_airport'])
-                    arr_airport = str(flight['arrival_airport'])
-                    
-                    if dep_airport not in airport_coords or arr_airport not in airport_coords:
-                        continue
-                    
-                    start_lat, start_lon = airport_coords[dep_airport]
-                    end_lat, end_lon = airport_coords[arr_airport]
-                    
-                    flight_number = str(flight.get('flight_iata', '')) 
-                    
-                    x1, y1 = m(start_lon, start_lat)
-                    x2, y2 = m(end_lon, end_lat)
-                    
-                    m.drawgreatcircle(
-                        start_lon, start_lat, 
-                        end_lon, end_lat, 
-                        linewidth=1.5, 
-                        color='blue', 
-                        alpha=0.7
-                    )
-                    routes_plotted += 1
-                    
-                    if dep_airport not in plotted_airports:
-                        m.plot(x1, y1, 'ro', markersize=6, alpha=0.8)
-                        plotted_airports.add(dep_airport)
-                        
-                        if len(plotted_airports) < 20:
-                            plt.annotate(
-                                dep_airport,
-                                xy=(x1, y1),
-                                xytext=(5, 5),
-                                textcoords="offset points",
-                                fontsize=8,
-                                color='darkred'
-                            )
-                    
-                    if arr_airport not in plotted_airports:
-                        m.plot(x2, y2, 'go', markersize=6, alpha=0.8)
-                        plotted_airports.add(arr_airport)
-                        
-                        if len(plotted_airports) < 20:
-                            plt.annotate(
-                                arr_airport,
-                                xy=(x2, y2),
-                                xytext=(5, 5),
-                                textcoords="offset points",
-                                fontsize=8,
-                                color='darkgreen'
-                            )
-                        
-                except Exception as e:
-                    print(f"Error plotting route {idx}: {e}")
-                    continue
-            
-            info_label.configure(text=f"Showing {routes_plotted} flight routes with {len(plotted_airports)} airports • Blue lines connect departure (red) to arrival (green) airports")
+            draw_ready_routes()
+            describe_routes()
             
             ax.set_title('Flight Routes Map')
             
@@ -1471,6 +1925,24 @@ class App(ctk.CTk):
             canvas.draw()
             canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
             
+            if pending_airports:
+                describe_routes(f" • Geocoding {len(pending_airports)} airports...")
+                
+                def on_resolved(name, coords, resolved):
+                    if not info_label.winfo_exists():
+                        return
+                    if coords:
+                        airport_coords[name] = coords
+                        draw_ready_routes()
+                        canvas.draw_idle()
+                    describe_routes(f" • Geocoding airports... ({resolved}/{len(pending_airports)})")
+                
+                def on_finished(resolved):
+                    if info_label.winfo_exists():
+                        describe_routes()
+                
+                self.stream_route_geocoding(pending_airports, on_resolved, on_finished)
+            
             self.create_route_details_table(map_data, parent_frame)
             
         except ImportError:
@@ -1550,19 +2022,36 @@ class App(ctk.CTk):
         loading_label.pack(pady=50)
         self.update_idletasks()
         
-        try:
+        limit = 25
+        flight_status = "scheduled"
+        
+        def load_jfk_flights(progress):
             print("DIRECT JFK TEST: Bypassing city lookup logic")
             print("DIRECT JFK TEST: Making direct API call for JFK")
             
-            limit = 25
-            flight_status = "scheduled"
-            
             flight_data = self.flight_client.get_direct_airport_flights(
                 dep_iata="JFK",
                 limit=limit,
                 flight_status=flight_status
             )
             
+            if not flight_data.empty:
+                progress("Preparing map...")
+                self.prepare_route_map_background()
+            
+            return flight_data
+        
+        self.run_in_background(
+            "flights",
+            load_jfk_flights,
+            lambda flight_data: self._show_jfk_test(flight_data, flight_status, loading_label),
+            "Error in JFK test",
+            loading_label,
+            on_done=self.update_flight_quota_label
+        )
+    
+    def _show_jfk_test(self, flight_data, flight_status, loading_label):
+        try:
             title = f"Test: JFK Airport Flights - {flight_status.capitalize()}"
             
             if flight_data.empty:
@@ -1634,46 +2123,11 @@ class App(ctk.CTk):
             loading_label.destroy()
             
         except Exception as e:
-            if 'loading_label' in locals():
+            if loading_label.winfo_exists():
                 loading_label.destroy()
             self.show_error(f"Error in JFK test: {str(e)}")
             print(f"JFK Test Error details: {str(e)}")
 
-    def get_airport_coordinates(self, airport_name):
-        try:
-            search_query = f"{airport_name} airport"
-            print(f"Searching for coordinates of: {search_query}")
-            
-            import requests
-            
-            url = "https://nominatim.openstreetmap.org/search"
-            headers = {
-                'User-Agent': 'OSINT-Dashboard/1.0'
-            }
-            params = {
-                'q': search_query,
-                'format': 'json',
-                'limit': 1
-            }
-            
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data and len(data) > 0:
-                lat = float(data[0]['lat'])
-                lon = float(data[0]['lon'])
-                print(f"Found coordinates for {airport_name}: ({lat}, {lon})")
-                return (lat, lon)
-            else:
-                print(f"No coordinates found for {airport_name}")
-                return None
-                
-        except Exception as e:
-            print(f"Error getting coordinates for {airport_name}: {e}")
-            return None
-
     def open_browser(self, url):
         webbrowser.open(url)
     
@@ -0,0 +1,96 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundTaskRunner:
+    """
+    Runs slow client calls on a worker thread pool and hands their results
+    back to the Tk main thread.
+
+    Worker threads never touch widgets. Everything they produce (progress
+    messages, results, errors) goes onto a queue which the UI drains with
+    process_pending(), normally from a Tk after() loop.
+    """
+
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="osint-fetch")
+        self.events = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._tasks = {}
+        self._latest_by_channel = {}
+
+    def submit(self, task, on_success=None, on_error=None, on_progress=None, channel=None):
+        """
+        Run task(progress) on the worker pool
+
+        Parameters:
+        - task: Callable taking a single progress(message) argument
+        - on_success: Called on the main thread with the task result
+        - on_error: Called on the main thread with the raised exception
+        - on_progress: Called on the main thread with each progress message
+        - channel: Optional name (e.g. the tab). A newer task on the same
+          channel supersedes an older one, whose callbacks are then dropped
+
+        Returns:
+        - Task id
+        """
+        with self._lock:
+            self._next_id += 1
+            task_id = self._next_id
+            self._tasks[task_id] = (channel, on_success, on_error, on_progress)
+            if channel is not None:
+                self._latest_by_channel[channel] = task_id
+
+        def progress(message):
+            self.events.put((task_id, "progress", message))
+
+        def run():
+            try:
+                result = task(progress)
+            except Exception as e:
+                traceback.print_exc()
+                self.events.put((task_id, "error", e))
+            else:
+                self.events.put((task_id, "done", result))
+
+        self.executor.submit(run)
+        return task_id
+
+    def process_pending(self, max_events=100):
+        """Dispatch queued worker events. Must be called from the main thread."""
+        for _ in range(max_events):
+            try:
+                task_id, kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            with self._lock:
+                if kind == "progress":
+                    entry = self._tasks.get(task_id)
+                else:
+                    entry = self._tasks.pop(task_id, None)
+
+                if entry is None:
+                    continue
+
+                channel = entry[0]
+                if channel is not None and self._latest_by_channel.get(channel) != task_id:
+                    continue
+
+            _, on_success, on_error, on_progress = entry
+            try:
+                if kind == "progress" and on_progress:
+                    on_progress(payload)
+                elif kind == "done" and on_success:
+                    on_success(payload)
+                elif kind == "error" and on_error:
+                    on_error(payload)
+            except Exception as e:
+                print(f"Error handling background task result: {e}")
+                traceback.print_exc()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,33 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def iter_pages(fetch, pages, max_workers, thread_name_prefix="pager"):
+    """
+    Fetch pages through a sliding window of at most max_workers requests
+
+    fetch(page) is called for each item of pages. Results are yielded in
+    page order as soon as each is ready, and the next page is only
+    submitted once the caller asks for more, so breaking out of the loop
+    (e.g. after a short page) stops further requests. Pages still in
+    flight are cancelled when the generator is closed; a failed page
+    raises from next().
+    """
+    pages = iter(pages)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+    pending = deque()
+
+    def submit_next():
+        page = next(pages, None)
+        if page is not None:
+            pending.append(executor.submit(fetch, page))
+
+    try:
+        for _ in range(max_workers):
+            submit_next()
+
+        while pending:
+            yield pending.popleft().result()
+            submit_next()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
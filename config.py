@@ -17,4 +17,85 @@ DEFAULT_COUNTRY = "us"
 DEFAULT_LANGUAGE = "en"
 
 CACHE_ENABLED = True
-CACHE_DURATION = 300
\ No newline at end of file
+CACHE_DURATION = 300
+CACHE_MAX_ENTRIES = 256
+CACHE_DIR = "Cache"
+DATA_DIR = "Data"
+CACHE_DISK_MAX_ENTRIES = 2000
+FLIGHT_CACHE_DURATION = 1800
+REFERENCE_CACHE_DURATION = 7 * 24 * 3600
+
+BACKGROUND_WORKERS = 4
+TASK_POLL_INTERVAL = 100
+
+FDA_MAX_WORKERS = 4
+FDA_MIRROR_DB = "fda_enforcement.db"
+FDA_MIRROR_INITIAL_RECORDS = 25000
+FDA_MIRROR_MAX_SYNC_RECORDS = 5000
+FDA_MIRROR_SYNC_INTERVAL = 3600
+
+HTTP_TIMEOUT = 15
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_DEFAULT_POOL_SIZE = 4
+HTTP_POOL_SIZES = {
+    "api.fda.gov": 8,
+    "api.aviationstack.com": 4,
+    "newsapi.org": 4,
+    "nominatim.openstreetmap.org": 2,
+}
+# AviationStack answers 429 once the monthly quota is used up, retrying won't help
+HTTP_RETRY_STATUS_OVERRIDES = {
+    "api.aviationstack.com": (500, 502, 503, 504),
+}
+# Requests per second; Nominatim's usage policy allows one
+HTTP_RATE_LIMITS = {
+    "nominatim.openstreetmap.org": 1.0,
+}
+
+GEOCODE_CACHE_DB = "airport_coordinates.db"
+GEOCODE_NEGATIVE_TTL = 7 * 24 * 3600
+GEOCODE_MAX_WORKERS = 4
+AIRPORT_DATASET = "resources/airports.csv"
+
+FLIGHT_PAGE_WORKERS = 3
+
+API_QUOTA_DB = "api_quota.db"
+AVIATIONSTACK_MONTHLY_BUDGET = 100
+FLIGHT_HISTORY_DIR = "flight_history"
+# Calls each historical backfill leaves untouched for other flight queries
+FLIGHT_BACKFILL_RESERVE_CALLS = 20
+FLIGHT_SNAPSHOT_DIR = "flight_snapshots"
+# Milliseconds between live board polls; each poll costs one AviationStack call
+FLIGHT_POLL_INTERVAL = 15 * 60 * 1000
+FLIGHT_CHANGES_DISPLAY_ROWS = 50
+
+REFERENCE_CATALOG_DB = "reference_catalog.db"
+REFERENCE_CATALOG_SYNC_INTERVAL = 30 * 24 * 3600
+REFERENCE_SYNC_PAGE_SIZE = 100
+REFERENCE_SYNC_MAX_CALLS = 10
+# Calls each catalog sync leaves untouched for flight queries
+REFERENCE_SYNC_RESERVE_CALLS = 20
+
+# Larger route graphs estimate betweenness from this many sampled airports
+ROUTE_BETWEENNESS_SAMPLES = 200
+ROUTE_HUB_DISPLAY_ROWS = 25
+
+NEWSAPI_PAGE_SIZE = 100
+NEWSAPI_PAGE_WORKERS = 3
+# /everything stops returning results past this many; 100 on the free developer plan
+NEWSAPI_MAX_RESULTS = 100
+
+NEWS_WATCH_DIR = "news_watch"
+# Milliseconds between polls of a watched news query
+NEWS_WATCH_INTERVAL = 30 * 60 * 1000
+NEWS_WATCH_MAX_ARTICLES = 100
+
+NEWS_DEDUP_INDEX = "news_dedup_index.pkl"
+NEWS_MINHASH_PERMUTATIONS = 64
+# 16 bands of 4 rows put the LSH candidate threshold near a Jaccard similarity of 0.5
+NEWS_LSH_BANDS = 16
+NEWS_DUPLICATE_THRESHOLD = 0.5
+# Articles published longer ago than this are dropped from the dedup index
+NEWS_DEDUP_MAX_AGE = 30 * 24 * 3600
@@ -0,0 +1,129 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from sync_state import SyncStateMixin
+
+
+class FDARecallMirror(SyncStateMixin):
+    """
+    Local SQLite copy of the openFDA food enforcement dataset
+
+    Records are stored as JSON keyed by recall_number, with the report and
+    recall initiation dates broken out for ordering and for the incremental
+    sync watermark.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS recalls ("
+                "recall_number TEXT PRIMARY KEY, "
+                "report_date TEXT, "
+                "recall_initiation_date TEXT, "
+                "record TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_recalls_initiation ON recalls (recall_initiation_date DESC)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_recalls_report ON recalls (report_date)"
+            )
+            self._create_sync_state_table()
+
+    def upsert(self, records):
+        """
+        Insert or replace records by recall_number
+
+        Returns:
+        - Number of records that were not in the mirror before
+        """
+        rows = []
+        for record in records:
+            recall_number = record.get('recall_number')
+            if not recall_number:
+                continue
+            rows.append((
+                recall_number,
+                record.get('report_date'),
+                record.get('recall_initiation_date'),
+                json.dumps(record)
+            ))
+
+        if not rows:
+            return 0
+
+        with self._lock, self._connection:
+            before = self._connection.execute("SELECT COUNT(*) FROM recalls").fetchone()[0]
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO recalls (recall_number, report_date, recall_initiation_date, record) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            after = self._connection.execute("SELECT COUNT(*) FROM recalls").fetchone()[0]
+
+        return after - before
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM recalls").fetchone()[0]
+
+    def watermark(self):
+        """Newest report_date in the mirror, falling back to recall_initiation_date"""
+        with self._lock:
+            report_date, initiation_date = self._connection.execute(
+                "SELECT MAX(report_date), MAX(recall_initiation_date) FROM recalls"
+            ).fetchone()
+        return report_date or initiation_date
+
+    def latest(self, limit=25, skip=0):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT record FROM recalls ORDER BY recall_initiation_date DESC, recall_number LIMIT ? OFFSET ?",
+                (limit, skip)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def records_after(self, rowid=0):
+        """
+        Records written since rowid, oldest write first
+
+        Replacing a record gives it a new rowid, so updated recalls are
+        returned again.
+
+        Returns:
+        - (last rowid, list of records)
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT rowid, record FROM recalls WHERE rowid > ? ORDER BY rowid",
+                (rowid,)
+            ).fetchall()
+        if not rows:
+            return rowid, []
+        return rows[-1][0], [json.loads(row[1]) for row in rows]
+
+    def last_sync_time(self):
+        return float(self.get_state('last_sync', 0))
+
+    def mark_synced(self):
+        self.set_state('last_sync', time.time())
+
+    def is_seeded(self):
+        return self.get_state('seeded') == '1'
+
+    def mark_seeded(self):
+        self.set_state('seeded', 1)
+
+    def needs_sync(self, max_age):
+        return not self.is_seeded() or time.time() - self.last_sync_time() > max_age
@@ -0,0 +1,54 @@
+import re
+
+from recall_index import SEARCH_FIELDS
+
+UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9'.&\- ]+")
+
+
+class FDAQueryPlanner:
+    """
+    Turns a recall search term into openFDA search= expressions
+
+    openFDA matches analyzed tokens rather than substrings, so the plan
+    only covers the exact-phrase and all-words tiers. Anything fuzzier is
+    left to the local RecallSearchIndex.
+    """
+
+    def __init__(self, fields=None):
+        self.fields = fields or SEARCH_FIELDS
+
+    @staticmethod
+    def clean(text):
+        return ' '.join(UNSAFE_CHARACTERS.sub(' ', text).split())
+
+    def _any_field(self, value):
+        return '(' + ' '.join(f'{field}:{value}' for field in self.fields) + ')'
+
+    def phrase_expression(self, term):
+        term = self.clean(term)
+        if not term:
+            return None
+        return self._any_field(f'"{term}"')
+
+    def words_expression(self, term):
+        words = self.clean(term).split()
+        if len(words) < 2:
+            return None
+        return ' AND '.join(self._any_field(f'"{word}"') for word in words)
+
+    def plan(self, term):
+        """
+        Returns:
+        - List of (tier name, search expression), most specific first
+        """
+        tiers = []
+
+        phrase = self.phrase_expression(term)
+        if phrase:
+            tiers.append(('exact', phrase))
+
+        words = self.words_expression(term)
+        if words:
+            tiers.append(('words', words))
+
+        return tiers
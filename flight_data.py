@@ -1,15 +1,200 @@
-import requests
 import pandas as pd
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from response_cache import cached
+from http_session import http_get
+from concurrent_pager import iter_pages
+from airport_index import get_airport_index
+from quota_budget import QuotaLedger, RequestCoalescer
+from flight_history import FlightHistoryStore, date_range
+from flight_snapshots import FlightSnapshotDiffer
+from reference_catalog import ReferenceCatalog
+import config
+
+FLIGHT_COLUMNS = [
+    'flight_date', 'flight_status',
+    'flight_number', 'flight_iata', 'flight_icao',
+    'airline_name', 'airline_iata', 'airline_icao'
+] + [
+    f'{role}_{field}'
+    for role in ('departure', 'arrival')
+    for field in ('airport', 'timezone', 'iata', 'icao', 'terminal', 'gate', 'delay',
+                  'scheduled', 'estimated', 'actual', 'estimated_runway', 'actual_runway')
+]
+
+FLIGHT_TIMESTAMP_COLUMNS = [
+    f'{role}_{field}'
+    for role in ('departure', 'arrival')
+    for field in ('scheduled', 'estimated', 'actual', 'estimated_runway', 'actual_runway')
+]
+
+FLIGHT_NUMERIC_COLUMNS = ['departure_delay', 'arrival_delay']
+
+
+def normalize_flights(flights):
+    """
+    Flatten AviationStack flight records into a DataFrame
+
+    Nested flight/airline/departure/arrival objects become prefixed columns.
+    Every result has the same FLIGHT_COLUMNS in the same order, whichever
+    endpoint it came from, with timestamps parsed to UTC datetime64 and
+    delays made numeric.
+    """
+    df = pd.json_normalize(flights, sep='_') if flights else pd.DataFrame()
+    df = df.reindex(columns=FLIGHT_COLUMNS)
+    
+    for column in FLIGHT_TIMESTAMP_COLUMNS:
+        df[column] = pd.to_datetime(df[column], utc=True, errors='coerce', format='ISO8601').astype('datetime64[ns, UTC]')
+    for column in FLIGHT_NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    
+    return df
+
+
+class UsageLimitReached(Exception):
+    pass
 
 class FlightDataClient:
     def __init__(self, api_key):
         self.api_key = api_key
         self.base_url = "http://api.aviationstack.com/v1/"
+        self.quota = QuotaLedger(
+            os.path.join(os.getcwd(), config.DATA_DIR, config.API_QUOTA_DB),
+            "aviationstack",
+            config.AVIATIONSTACK_MONTHLY_BUDGET
+        )
+        self._coalescer = RequestCoalescer()
+        self._history_store = None
+        self._snapshot_differ = None
+        self._reference_catalog = None
+        self._catalog_lock = threading.RLock()
+    
+    def quota_status(self):
+        return self.quota.status(self.api_key)
+    
+    def _request(self, endpoint, params):
+        """
+        Make one AviationStack call, sharing it with identical calls already in flight
+
+        Returns:
+        - Parsed JSON response
+        """
+        key = (endpoint, tuple(sorted(params.items())))
+        return self._coalescer.run(key, lambda: self._call_api(endpoint, params))
+    
+    def _call_api(self, endpoint, params):
+        if not self.quota.reserve(self.api_key):
+            status = self.quota_status()
+            print(f"API USAGE ERROR: Monthly budget used up ({status['used']}/{status['budget']} calls)")
+            raise UsageLimitReached(
+                f"Monthly API budget used up ({status['used']} of {status['budget']} calls this month)"
+            )
+        
+        response = http_get(f"{self.base_url}{endpoint}", params=params)
+        print(f"API Response Status: {response.status_code}")
+        
+        if response.status_code == 429:
+            print("API USAGE ERROR: Monthly usage limit has been reached")
+            self.quota.mark_exhausted(self.api_key)
+            raise UsageLimitReached("Monthly API usage limit reached (100 calls for free tier)")
+            
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        if 'error' in data:
+            error_code = data.get('error', {}).get('code', '')
+            error_msg = data.get('error', {}).get('message', '')
+            print(f"API Error: {error_code} - {error_msg}")
+            
+            if 'usage_limit_reached' in error_code:
+                self.quota.mark_exhausted(self.api_key)
+                raise UsageLimitReached("Monthly API usage limit reached (100 calls for free tier)")
+            elif 'invalid_access_key' in error_code:
+                raise Exception("Invalid API access key. Please check your key in config.py")
+            elif 'inactive_user' in error_code:
+                raise Exception("Inactive user account. Please activate your account on the AviationStack website")
+            else:
+                raise Exception(f"API Error: {error_msg}")
+        
+        return data
     
-    def get_real_time_flights(self, limit=100, offset=0, flight_status=None, airline_iata=None, departure_city=None):
+    def _fetch_flight_records(self, params, paginate=False, max_rows=None, max_calls=None, max_workers=None,
+                              allow_partial=True, endpoint='flights', with_total=False, keep_pages_on_error=False):
+        """
+        Fetch raw flight records, or records of another paged endpoint, optionally following pagination
+
+        With paginate, the first response's pagination.total decides how many
+        more pages exist. The rest are fetched concurrently, at most
+        max_workers at a time, until max_rows records or max_calls requests
+        are used. If the monthly usage limit is hit part way through, the
+        pages fetched so far are returned, or the error is raised when
+        allow_partial is False. With keep_pages_on_error, any other failed
+        page also ends pagination with the pages fetched so far.
+
+        Returns:
+        - List of flight dicts from the API, or (records, available) with
+          with_total, where available is how many records the query has from
+          its starting offset on
+        """
+        data = self._request(endpoint, params)
+        records = list(data.get('data') or [])
+        
+        pagination = data.get('pagination') or {}
+        start = int(pagination.get('offset') or params.get('offset') or 0)
+        total = int(pagination.get('total') or 0)
+        available = max(total - start, len(records))
+        
+        def result(records):
+            records = records[:max_rows] if max_rows is not None else records
+            return (records, available) if with_total else records
+        
+        if not paginate or not records:
+            return result(records)
+        
+        page_size = int(pagination.get('limit') or params.get('limit') or len(records))
+        
+        end = total if max_rows is None else min(total, start + max_rows)
+        offsets = list(range(start + len(records), end, page_size))
+        if max_calls is not None:
+            offsets = offsets[:max(max_calls - 1, 0)]
+        
+        if not offsets:
+            return result(records)
+        
+        print(f"Paginating {endpoint}: {total} available, fetching {len(offsets)} more pages of {page_size}")
+        
+        pages = iter_pages(
+            lambda offset: self._request(endpoint, dict(params, offset=offset, limit=page_size)),
+            offsets,
+            max_workers or config.FLIGHT_PAGE_WORKERS,
+            thread_name_prefix="flight-pager"
+        )
+        try:
+            for page in pages:
+                page_records = page.get('data') or []
+                records.extend(page_records)
+                if len(page_records) < page_size:
+                    break
+        except UsageLimitReached:
+            if not allow_partial:
+                raise
+            print(f"Usage limit reached while paginating, keeping {len(records)} records")
+        except Exception as e:
+            if not keep_pages_on_error:
+                raise
+            print(f"Error paginating {endpoint}, keeping {len(records)} records: {e}")
+        finally:
+            pages.close()
+        
+        return result(records)
+    
+    @cached("flights", ttl=config.FLIGHT_CACHE_DURATION)
+    def get_real_time_flights(self, limit=100, offset=0, flight_status=None, airline_iata=None, departure_city=None,
+                              paginate=False, max_rows=None, max_calls=None):
         try:
             print(f"Starting get_real_time_flights with params: status={flight_status}, city={departure_city}, limit={limit}")
             url = f"{self.base_url}flights"
@@ -34,113 +219,135 @@ class FlightDataClient:
             
             print(f"API Request URL: {url}")
             print(f"API Request Params: {params}")
-            response = requests.get(url, params=params)
-            print(f"API Response Status: {response.status_code}")
-            
-            if response.status_code == 429:
-                print("API USAGE ERROR: Monthly usage limit has been reached")
-                raise Exception("Monthly API usage limit reached (100 calls for free tier)")
-                
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'error' in data:
-                error_code = data.get('error', {}).get('code', '')
-                error_msg = data.get('error', {}).get('message', '')
-                print(f"API Error: {error_code} - {error_msg}")
-                
-                if 'usage_limit_reached' in error_code:
-                    raise Exception("Monthly API usage limit reached (100 calls for free tier)")
-                elif 'invalid_access_key' in error_code:
-                    raise Exception("Invalid API access key. Please check your key in config.py")
-                elif 'inactive_user' in error_code:
-                    raise Exception("Inactive user account. Please activate your account on the AviationStack website")
-                else:
-                    raise Exception(f"API Error: {error_msg}")
-            
-            print(f"API Response Keys: {data.keys() if data else 'No data'}")
+            flights = self._fetch_flight_records(params, paginate, max_rows, max_calls)
             
-            if 'data' not in data or not data['data']:
+            if not flights:
                 print("No flight data in response")
                 return pd.DataFrame()
             
-            print(f"Found {len(data['data'])} flights in response")
-            flattened_data = []
-            for flight in data['data']:
-                flight_info = {}
-                
-                flight_info['flight_date'] = flight.get('flight_date')
-                flight_info['flight_status'] = flight.get('flight_status')
+            print(f"Found {len(flights)} flights in response")
+            df = normalize_flights(flights)
+            return df
+        
+        except Exception as e:
+            print(f"Error fetching real-time flights: {e}")
+            return pd.DataFrame()
+    
+    def get_reference_catalog(self):
+        if self._reference_catalog is None:
+            db_path = os.path.join(os.getcwd(), config.DATA_DIR, config.REFERENCE_CATALOG_DB)
+            self._reference_catalog = ReferenceCatalog(db_path)
+        return self._reference_catalog
+    
+    def sync_reference_catalog(self, table, force=False, progress_callback=None):
+        """
+        Page through /airports or /airlines into the local reference catalog
+
+        Only run on an explicit request, never when a tab is viewed. Each
+        pass uses at most REFERENCE_SYNC_MAX_CALLS calls and always
+        leaves REFERENCE_SYNC_RESERVE_CALLS of the monthly budget for
+        flight queries. A pass that stops short, including on a failed
+        page, stores the pages it fetched and saves its offset so the next
+        one resumes there. Complete catalogs are refreshed after
+        REFERENCE_CATALOG_SYNC_INTERVAL seconds.
+
+        Returns:
+        - The catalog, or None if it is unavailable and still empty
+        """
+        with self._catalog_lock:
+            try:
+                catalog = self.get_reference_catalog()
                 
-                if 'flight' in flight:
-                    flight_info['flight_number'] = flight['flight'].get('number')
-                    flight_info['flight_iata'] = flight['flight'].get('iata')
-                    flight_info['flight_icao'] = flight['flight'].get('icao')
+                if not force and not catalog.needs_sync(table, config.REFERENCE_CATALOG_SYNC_INTERVAL):
+                    return catalog
                 
-                if 'airline' in flight:
-                    flight_info['airline_name'] = flight['airline'].get('name')
-                    flight_info['airline_iata'] = flight['airline'].get('iata')
-                    flight_info['airline_icao'] = flight['airline'].get('icao')
+                max_calls = min(config.REFERENCE_SYNC_MAX_CALLS,
+                                self.quota_status()['remaining'] - config.REFERENCE_SYNC_RESERVE_CALLS)
+                if max_calls <= 0:
+                    print(f"Skipping {table} catalog sync, not enough API budget left")
+                    return catalog if catalog.count(table) > 0 else None
                 
-                if 'departure' in flight:
-                    departure_data = flight['departure']
-                    for key, value in departure_data.items():
-                        flight_info[f'departure_{key}'] = value
+                offset = catalog.sync_offset(table)
+                page_size = config.REFERENCE_SYNC_PAGE_SIZE
+                print(f"Syncing {table} catalog from offset {offset}, up to {max_calls} calls...")
+                if progress_callback:
+                    progress_callback(f"Updating local {table} catalog...")
                 
-                if 'arrival' in flight:
-                    arrival_data = flight['arrival']
-                    for key, value in arrival_data.items():
-                        flight_info[f'arrival_{key}'] = value
+                params = {
+                    'access_key': self.api_key,
+                    'limit': page_size,
+                    'offset': offset
+                }
+                records, available = self._fetch_flight_records(params, paginate=True, max_calls=max_calls,
+                                                                endpoint=table, with_total=True,
+                                                                keep_pages_on_error=True)
+                added = catalog.upsert(table, records)
                 
-                have_coordinates = (
-                    'departure_latitude' in flight_info and 
-                    'departure_longitude' in flight_info and
-                    'arrival_latitude' in flight_info and 
-                    'arrival_longitude' in flight_info
-                )
+                if len(records) >= available:
+                    catalog.mark_synced(table)
+                else:
+                    catalog.set_sync_offset(table, offset + len(records))
                 
-                if have_coordinates:
-                    print(f"Flight {flight_info.get('flight_iata', 'Unknown')}: "
-                          f"From {flight_info.get('departure_airport', 'Unknown')} "
-                          f"({flight_info.get('departure_latitude', '?')}, {flight_info.get('departure_longitude', '?')}) "
-                          f"To {flight_info.get('arrival_airport', 'Unknown')} "
-                          f"({flight_info.get('arrival_latitude', '?')}, {flight_info.get('arrival_longitude', '?')})")
-                          
-                flattened_data.append(flight_info)
+                print(f"{table.capitalize()} catalog synced: {added} new records, {catalog.count(table)} total")
+                return catalog
             
-            df = pd.DataFrame(flattened_data)
-            return df
-        
+            except Exception as e:
+                print(f"Error syncing {table} catalog: {e}")
+                if self._reference_catalog is not None and self._reference_catalog.count(table) > 0:
+                    return self._reference_catalog
+                return None
+    
+    def catalog_airport_coordinates(self, code):
+        """
+        Airport position from the local catalog by IATA or ICAO code, without syncing
+
+        Returns:
+        - (lat, lon) or None
+        """
+        column = 'iata_code' if len(code) == 3 else 'icao_code'
+        try:
+            records = self.get_reference_catalog().find('airports', limit=1, **{column: code})
+            if records and records[0].get('latitude') and records[0].get('longitude'):
+                return float(records[0]['latitude']), float(records[0]['longitude'])
         except Exception as e:
-            print(f"Error fetching real-time flights: {e}")
+            print(f"Error looking up {code} in airport catalog: {e}")
+        return None
+    
+    def _get_reference_data(self, table, iata_code=None, country=None, limit=100, offset=0):
+        """
+        Reference records from the local catalog, or one API page when the catalog has none
+
+        A fetched page is kept in the catalog, so viewing a tab costs at
+        most one call and never starts a bulk sync.
+        """
+        catalog = self.get_reference_catalog()
+        records = catalog.find(table, iata_code=iata_code, country=country, limit=limit, offset=offset)
+        if records:
+            return pd.DataFrame(records)
+        
+        params = {
+            'access_key': self.api_key,
+            'limit': limit,
+            'offset': offset
+        }
+        
+        if iata_code:
+            params['iata_code'] = iata_code
+        if country:
+            params['country_name'] = country
+        
+        data = self._request(table, params)
+        
+        if 'data' not in data or not data['data']:
             return pd.DataFrame()
+        
+        catalog.upsert(table, data['data'])
+        df = pd.DataFrame(data['data'])
+        return df
     
     def get_airport_data(self, iata_code=None, country=None, limit=100, offset=0):
         try:
-            url = f"{self.base_url}airports"
-            
-            params = {
-                'access_key': self.api_key,
-                'limit': limit,
-                'offset': offset
-            }
-            
-            if iata_code:
-                params['iata_code'] = iata_code
-            if country:
-                params['country_name'] = country
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'data' not in data or not data['data']:
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(data['data'])
-            return df
+            return self._get_reference_data('airports', iata_code, country, limit, offset)
         
         except Exception as e:
             print(f"Error fetching airport data: {e}")
@@ -148,141 +355,152 @@ class FlightDataClient:
     
     def get_airline_data(self, iata_code=None, country=None, limit=100, offset=0):
         try:
-            url = f"{self.base_url}airlines"
-            
-            params = {
-                'access_key': self.api_key,
-                'limit': limit,
-                'offset': offset
-            }
-            
-            if iata_code:
-                params['iata_code'] = iata_code
-            if country:
-                params['country_name'] = country
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'data' not in data or not data['data']:
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(data['data'])
-            return df
+            return self._get_reference_data('airlines', iata_code, country, limit, offset)
         
         except Exception as e:
             print(f"Error fetching airline data: {e}")
             return pd.DataFrame()
     
-    def get_historical_flights(self, flight_icao=None, flight_date=None, limit=100, offset=0):
+    @cached("flights", ttl=config.FLIGHT_CACHE_DURATION)
+    def get_historical_flights(self, flight_icao=None, flight_date=None, limit=100, offset=0,
+                               paginate=False, max_rows=None, max_calls=None, dep_iata=None, arr_iata=None):
         try:
-            url = f"{self.base_url}flights"
-            
-            params = {
-                'access_key': self.api_key,
-                'limit': limit,
-                'offset': offset
-            }
-            
-            if flight_icao:
-                params['flight_icao'] = flight_icao
-            
             if not flight_date:
                 yesterday = datetime.now() - timedelta(days=1)
                 flight_date = yesterday.strftime('%Y-%m-%d')
             
-            params['flight_date'] = flight_date
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'data' not in data or not data['data']:
-                return pd.DataFrame()
-            
-            flattened_data = []
-            for flight in data['data']:
-                flight_info = {}
-                
-                flight_info['flight_date'] = flight.get('flight_date')
-                flight_info['flight_status'] = flight.get('flight_status')
-                
-                if 'flight' in flight:
-                    flight_info['flight_number'] = flight['flight'].get('number')
-                    flight_info['flight_iata'] = flight['flight'].get('iata')
-                    flight_info['flight_icao'] = flight['flight'].get('icao')
-                
-                if 'airline' in flight:
-                    flight_info['airline_name'] = flight['airline'].get('name')
-                    flight_info['airline_iata'] = flight['airline'].get('iata')
-                    flight_info['airline_icao'] = flight['airline'].get('icao')
-                
-                if 'departure' in flight:
-                    flight_info['departure_airport'] = flight['departure'].get('airport')
-                    flight_info['departure_iata'] = flight['departure'].get('iata')
-                    flight_info['departure_icao'] = flight['departure'].get('icao')
-                    flight_info['departure_terminal'] = flight['departure'].get('terminal')
-                    flight_info['departure_gate'] = flight['departure'].get('gate')
-                    flight_info['departure_scheduled'] = flight['departure'].get('scheduled')
-                    flight_info['departure_actual'] = flight['departure'].get('actual')
-                
-                if 'arrival' in flight:
-                    flight_info['arrival_airport'] = flight['arrival'].get('airport')
-                    flight_info['arrival_iata'] = flight['arrival'].get('iata')
-                    flight_info['arrival_icao'] = flight['arrival'].get('icao')
-                    flight_info['arrival_terminal'] = flight['arrival'].get('terminal')
-                    flight_info['arrival_gate'] = flight['arrival'].get('gate')
-                    flight_info['arrival_scheduled'] = flight['arrival'].get('scheduled')
-                    flight_info['arrival_actual'] = flight['arrival'].get('actual')
-                
-                flattened_data.append(flight_info)
-            
-            df = pd.DataFrame(flattened_data)
-            return df
+            return self._fetch_historical_day(flight_date, flight_icao, dep_iata, arr_iata,
+                                              limit, offset, paginate, max_rows, max_calls)
         
         except Exception as e:
             print(f"Error fetching historical flights: {e}")
             return pd.DataFrame()
-
-    def get_airport_iata_by_city(self, city_name):
-        common_airports = {
-            "Atlanta": "ATL",
-            "Boston": "BOS",
-            "Chicago": "ORD",
-            "Dallas": "DFW",
-            "Denver": "DEN",
-            "Detroit": "DTW",
-            "Houston": "IAH",
-            "Las Vegas": "LAS",
-            "Los Angeles": "LAX",
-            "Miami": "MIA",
-            "Minneapolis": "MSP",
-            "New York": "JFK",
-            "Orlando": "MCO",
-            "Philadelphia": "PHL",
-            "Phoenix": "PHX",
-            "San Diego": "SAN",
-            "San Francisco": "SFO",
-            "Seattle": "SEA",
-            "Washington DC": "IAD",
-            "London": "LHR",
-            "Paris": "CDG",
-            "Tokyo": "HND",
-            "Beijing": "PEK",
-            "Sydney": "SYD",
-            "Dubai": "DXB",
-            "Toronto": "YYZ",
-            "Mexico City": "MEX",
-            "Berlin": "BER",
-            "Madrid": "MAD"
+    
+    def _fetch_historical_day(self, flight_date, flight_icao=None, dep_iata=None, arr_iata=None,
+                              limit=100, offset=0, paginate=False, max_rows=None, max_calls=None,
+                              allow_partial=True, with_total=False):
+        params = {
+            'access_key': self.api_key,
+            'limit': limit,
+            'offset': offset,
+            'flight_date': flight_date
         }
         
-        if city_name in common_airports:
-            iata_code = common_airports[city_name]
-            print(f"Using mapped IATA code for {city_name}: {iata_code}")
+        if flight_icao:
+            params['flight_icao'] = flight_icao
+        if dep_iata:
+            params['dep_iata'] = dep_iata
+        if arr_iata:
+            params['arr_iata'] = arr_iata
+        
+        flights = self._fetch_flight_records(params, paginate, max_rows, max_calls,
+                                             allow_partial=allow_partial, with_total=with_total)
+        if with_total:
+            flights, available = flights
+            return normalize_flights(flights), available
+        return normalize_flights(flights)
+    
+    def get_history_store(self):
+        if self._history_store is None:
+            self._history_store = FlightHistoryStore(os.path.join(os.getcwd(), config.DATA_DIR, config.FLIGHT_HISTORY_DIR))
+        return self._history_store
+    
+    def get_snapshot_differ(self):
+        if self._snapshot_differ is None:
+            self._snapshot_differ = FlightSnapshotDiffer(os.path.join(os.getcwd(), config.DATA_DIR, config.FLIGHT_SNAPSHOT_DIR))
+        return self._snapshot_differ
+    
+    def poll_flight_board(self, limit=100, flight_status=None, departure_city=None):
+        """
+        Fetch a fresh real-time board and diff it against the previous poll of the same query
+
+        The response cache is bypassed so every poll sees current data. A
+        failed or empty fetch leaves the previous snapshot in place.
+
+        Returns:
+        - (flight_data, changes) DataFrames
+        """
+        flight_data = self.get_real_time_flights(
+            limit=limit,
+            flight_status=flight_status,
+            departure_city=departure_city,
+            refresh=True
+        )
+        if flight_data.empty:
+            return flight_data, pd.DataFrame()
+        
+        board_key = FlightHistoryStore.filter_key(
+            board='realtime',
+            limit=limit,
+            flight_status=flight_status,
+            departure_city=departure_city
+        )
+        changes = self.get_snapshot_differ().update(board_key, flight_data)
+        return flight_data, changes
+    
+    def backfill_historical_flights(self, start_date, end_date, flight_icao=None, dep_iata=None, arr_iata=None,
+                                    limit=100, max_rows_per_day=None, max_calls_per_day=None,
+                                    max_workers=None, progress_callback=None):
+        """
+        Fetch every day from start_date to end_date into the flight history store
+
+        Days already stored are skipped, unless they were stored truncated
+        and fewer than max_rows_per_day flights (or, without a cap, the
+        whole day) are wanted now. Missing days are fetched concurrently,
+        each with pagination, within the remaining monthly API budget less
+        FLIGHT_BACKFILL_RESERVE_CALLS: the budget is split evenly into a call
+        allowance per day, and if it does not stretch to one call a day only
+        the most recent days are fetched. A day cut short by its allowance is
+        stored as truncated. Days that fail are left unstored so a later
+        backfill picks them up.
+
+        Returns:
+        - DataFrame of all stored flights in the range
+        """
+        store = self.get_history_store()
+        filter_key = store.filter_key(flight_icao=flight_icao, dep_iata=dep_iata, arr_iata=arr_iata)
+        dates = date_range(start_date, end_date)
+        missing = store.missing_dates(filter_key, dates, min_rows=max_rows_per_day)
+        print(f"Backfill {filter_key}: {len(dates) - len(missing)} of {len(dates)} days already stored")
+        
+        usable_calls = max(self.quota_status()['remaining'] - config.FLIGHT_BACKFILL_RESERVE_CALLS, 0)
+        if len(missing) > usable_calls:
+            print(f"Only {usable_calls} API calls available for backfill, fetching {usable_calls} of {len(missing)} days")
+            missing = missing[-usable_calls:] if usable_calls else []
+        
+        if missing:
+            day_allowance = usable_calls // len(missing)
+            max_calls_per_day = min(max_calls_per_day or day_allowance, day_allowance)
+        
+        def fetch_day(flight_date):
+            df, available = self._fetch_historical_day(flight_date, flight_icao, dep_iata, arr_iata, limit,
+                                                       paginate=True, max_rows=max_rows_per_day,
+                                                       max_calls=max_calls_per_day, allow_partial=False,
+                                                       with_total=True)
+            store.write(filter_key, flight_date, df, complete=len(df) >= available)
+            return len(df)
+        
+        if missing:
+            max_workers = max_workers or config.FLIGHT_PAGE_WORKERS
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="flight-backfill") as executor:
+                futures = {executor.submit(fetch_day, flight_date): flight_date for flight_date in missing}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    flight_date = futures[future]
+                    try:
+                        print(f"Stored {future.result()} flights for {flight_date}")
+                    except Exception as e:
+                        print(f"Error backfilling flights for {flight_date}: {e}")
+                    
+                    if progress_callback:
+                        progress_callback(f"Fetched {done} of {len(missing)} days...")
+        
+        return store.load(filter_key, dates)
+
+    @cached("flights", ttl=config.REFERENCE_CACHE_DURATION)
+    def get_airport_iata_by_city(self, city_name):
+        iata_code = get_airport_index().iata_for_city(city_name)
+        if iata_code:
+            print(f"Using bundled IATA code for {city_name}: {iata_code}")
             return iata_code
             
         try:
@@ -291,20 +509,14 @@ class FlightDataClient:
                 print(f"Input appears to be an IATA code already: {city_name}")
                 return city_name
                 
-            url = f"{self.base_url}airports"
-            
             params = {
                 'access_key': self.api_key,
                 'city_name': city_name,
                 'limit': 10
             }
             
-            print(f"Making request to: {url} with params: {params}")
-            response = requests.get(url, params=params)
-            print(f"API Response Status: {response.status_code}")
-            response.raise_for_status()
-            
-            data = response.json()
+            print(f"Making request to: {self.base_url}airports with params: {params}")
+            data = self._request('airports', params)
             print(f"API response: {data.keys()}")
             
             if 'data' not in data or not data['data']:
@@ -326,7 +538,9 @@ class FlightDataClient:
             print(f"Error fetching airport data for city {city_name}: {e}")
             return None
 
-    def get_direct_airport_flights(self, dep_iata, limit=100, offset=0, flight_status=None):
+    @cached("flights", ttl=config.FLIGHT_CACHE_DURATION)
+    def get_direct_airport_flights(self, dep_iata, limit=100, offset=0, flight_status=None,
+                                   paginate=False, max_rows=None, max_calls=None):
         try:
             print(f"DIRECT AIRPORT SEARCH: Using IATA code {dep_iata} directly")
             url = f"{self.base_url}flights"
@@ -343,77 +557,15 @@ class FlightDataClient:
             
             print(f"Direct Airport API Request: {url}")
             print(f"Direct Airport API Params: {params}")
-            response = requests.get(url, params=params)
-            print(f"Direct Airport API Response Status: {response.status_code}")
-            response.raise_for_status()
+            flights = self._fetch_flight_records(params, paginate, max_rows, max_calls)
             
-            data = response.json()
-            print(f"Direct Airport API Response Keys: {data.keys() if data else 'No data'}")
-            
-            if 'error' in data:
-                error_code = data.get('error', {}).get('code', '')
-                error_msg = data.get('error', {}).get('message', '')
-                print(f"API Error: {error_code} - {error_msg}")
-                
-                if 'usage_limit_reached' in error_code:
-                    raise Exception("Monthly API usage limit reached (100 calls for free tier)")
-                elif 'invalid_access_key' in error_code:
-                    raise Exception("Invalid API access key. Please check your key in config.py")
-                elif 'inactive_user' in error_code:
-                    raise Exception("Inactive user account. Please activate your account on the AviationStack website")
-                else:
-                    raise Exception(f"API Error: {error_msg}")
-            
-            if 'data' not in data or not data['data']:
+            if not flights:
                 print(f"No flight data found for airport {dep_iata}")
                 return pd.DataFrame()
             
-            print(f"Found {len(data['data'])} flights for airport {dep_iata}")
-            
-            flattened_data = []
-            for flight in data['data']:
-                flight_info = {}
-                
-                flight_info['flight_date'] = flight.get('flight_date')
-                flight_info['flight_status'] = flight.get('flight_status')
-                
-                if 'flight' in flight:
-                    flight_info['flight_number'] = flight['flight'].get('number')
-                    flight_info['flight_iata'] = flight['flight'].get('iata')
-                    flight_info['flight_icao'] = flight['flight'].get('icao')
-                
-                if 'airline' in flight:
-                    flight_info['airline_name'] = flight['airline'].get('name')
-                    flight_info['airline_iata'] = flight['airline'].get('iata')
-                    flight_info['airline_icao'] = flight['airline'].get('icao')
-                
-                if 'departure' in flight:
-                    departure_data = flight['departure']
-                    for key, value in departure_data.items():
-                        flight_info[f'departure_{key}'] = value
-                
-                if 'arrival' in flight:
-                    arrival_data = flight['arrival']
-                    for key, value in arrival_data.items():
-                        flight_info[f'arrival_{key}'] = value
-                
-                have_coordinates = (
-                    'departure_latitude' in flight_info and 
-                    'departure_longitude' in flight_info and
-                    'arrival_latitude' in flight_info and 
-                    'arrival_longitude' in flight_info
-                )
-                
-                if have_coordinates:
-                    print(f"Flight {flight_info.get('flight_iata', 'Unknown')}: "
-                          f"From {flight_info.get('departure_airport', 'Unknown')} "
-                          f"({flight_info.get('departure_latitude', '?')}, {flight_info.get('departure_longitude', '?')}) "
-                          f"To {flight_info.get('arrival_airport', 'Unknown')} "
-                          f"({flight_info.get('arrival_latitude', '?')}, {flight_info.get('arrival_longitude', '?')})")
-                
-                flattened_data.append(flight_info)
+            print(f"Found {len(flights)} flights for airport {dep_iata}")
             
-            df = pd.DataFrame(flattened_data)
+            df = normalize_flights(flights)
             return df
             
         except Exception as e:
@@ -0,0 +1,125 @@
+import json
+import os
+import re
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+
+def date_range(start_date, end_date):
+    """Inclusive list of YYYY-MM-DD strings from start_date to end_date"""
+    start = _as_date(start_date)
+    end = _as_date(end_date)
+    return [(start + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range((end - start).days + 1)]
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), '%Y-%m-%d').date()
+
+
+class FlightHistoryStore:
+    """
+    Historical flights stored as one pickled DataFrame per flight date
+
+    Partitions are grouped by the query filters, e.g.
+    Data/flight_history/dep_iata=JFK/2024-05-01.pkl, so the same day can be
+    stored for different airports or flights. A day with no flights is
+    stored as an empty frame so it is not fetched again.
+
+    Each partition has a small JSON sidecar with its row count and whether
+    it holds every flight of the day. A day cut short by a row cap or call
+    allowance is fetched again when a later backfill asks for more rows.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+
+    @staticmethod
+    def filter_key(**filters):
+        parts = [f"{name}={value}" for name, value in sorted(filters.items()) if value]
+        key = ','.join(parts) or 'all'
+        return re.sub(r'[^A-Za-z0-9=,_-]', '_', key)
+
+    def _partition_dir(self, filter_key):
+        return os.path.join(self.root_dir, filter_key)
+
+    def _partition_path(self, filter_key, flight_date):
+        return os.path.join(self._partition_dir(filter_key), f"{flight_date}.pkl")
+
+    def _meta_path(self, filter_key, flight_date):
+        return os.path.join(self._partition_dir(filter_key), f"{flight_date}.meta.json")
+
+    def has(self, filter_key, flight_date):
+        return os.path.exists(self._partition_path(filter_key, flight_date))
+
+    def partition_info(self, filter_key, flight_date):
+        """
+        Returns:
+        - Dict with rows and complete for a stored partition, or None if the day is not stored.
+          A partition without a readable sidecar counts as incomplete with 0 rows.
+        """
+        if not self.has(filter_key, flight_date):
+            return None
+        try:
+            with open(self._meta_path(filter_key, flight_date)) as f:
+                meta = json.load(f)
+            return {'rows': int(meta['rows']), 'complete': bool(meta['complete'])}
+        except Exception:
+            return {'rows': 0, 'complete': False}
+
+    def needs_fetch(self, filter_key, flight_date, min_rows=None):
+        """
+        True if the day is not stored, or it is truncated and holds fewer than min_rows flights
+
+        min_rows of None asks for the whole day, so any truncated partition is fetched again.
+        """
+        info = self.partition_info(filter_key, flight_date)
+        if info is None:
+            return True
+        if info['complete']:
+            return False
+        return min_rows is None or info['rows'] < min_rows
+
+    def missing_dates(self, filter_key, dates, min_rows=None):
+        return [flight_date for flight_date in dates if self.needs_fetch(filter_key, flight_date, min_rows)]
+
+    def write(self, filter_key, flight_date, df, complete=True):
+        partition_dir = self._partition_dir(filter_key)
+        if not os.path.exists(partition_dir):
+            os.makedirs(partition_dir, exist_ok=True)
+
+        path = self._partition_path(filter_key, flight_date)
+        temp_path = f"{path}.tmp"
+        df.to_pickle(temp_path)
+        os.replace(temp_path, path)
+
+        meta_path = self._meta_path(filter_key, flight_date)
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump({'rows': len(df), 'complete': bool(complete)}, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def load(self, filter_key, dates):
+        """
+        Concatenate the stored partitions for dates, skipping any that are missing
+
+        Returns:
+        - DataFrame of all stored flights for those dates
+        """
+        frames = []
+        for flight_date in dates:
+            path = self._partition_path(filter_key, flight_date)
+            if not os.path.exists(path):
+                continue
+            try:
+                frames.append(pd.read_pickle(path))
+            except Exception as e:
+                print(f"Error reading flight history partition {path}: {e}")
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
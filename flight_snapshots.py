@@ -0,0 +1,126 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_KEY = ['flight_date', 'flight_iata']
+
+TRACKED_COLUMNS = ['flight_status', 'departure_gate', 'arrival_gate', 'departure_delay', 'arrival_delay']
+
+
+class FlightSnapshotDiffer:
+    """
+    Compares successive snapshots of a flight board and keeps only what changed
+
+    Each board (one polled query) keeps its previous snapshot keyed by
+    (flight_date, flight_iata). A new snapshot is diffed against it
+    column-wise on the tracked status, gate and delay columns. Only new
+    flights and changed rows are appended to the board's change log; the
+    latest snapshot itself is kept so diffs survive a restart.
+    """
+
+    def __init__(self, root_dir, tracked_columns=None):
+        self.root_dir = root_dir
+        self.tracked_columns = tracked_columns or TRACKED_COLUMNS
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+        if self.root_dir and not os.path.exists(self.root_dir):
+            os.makedirs(self.root_dir)
+
+    def _snapshot_path(self, board_key):
+        return os.path.join(self.root_dir, f"{board_key}.snapshot.pkl")
+
+    def changes_path(self, board_key):
+        return os.path.join(self.root_dir, f"{board_key}.changes.csv")
+
+    def _previous(self, board_key):
+        snapshot = self._snapshots.get(board_key)
+        if snapshot is None and os.path.exists(self._snapshot_path(board_key)):
+            try:
+                snapshot = pd.read_pickle(self._snapshot_path(board_key))
+            except Exception as e:
+                print(f"Error reading flight snapshot for {board_key}: {e}")
+        return snapshot
+
+    @property
+    def change_columns(self):
+        previous = [f'{column}_previous' for column in self.tracked_columns]
+        return SNAPSHOT_KEY + ['change', 'changed_fields'] + self.tracked_columns + previous
+
+    def _keyed(self, df):
+        columns = SNAPSHOT_KEY + self.tracked_columns
+        keyed = df.reindex(columns=columns).dropna(subset=['flight_iata'])
+        keyed = keyed.drop_duplicates(subset=SNAPSHOT_KEY, keep='last')
+        return keyed.set_index(SNAPSHOT_KEY)
+
+    @staticmethod
+    def _comparable(frame):
+        return frame.astype(object).where(frame.notna(), None).to_numpy()
+
+    def diff(self, previous, current):
+        """
+        Rows of current that are new or differ from previous on a tracked column
+
+        Returns:
+        - DataFrame with the key, change ('new' or 'changed'), changed_fields,
+          the tracked columns and their *_previous values
+        """
+        current = self._keyed(current)
+        if previous is None or previous.empty:
+            changes = current.reset_index()
+            changes.insert(2, 'change', 'new')
+            changes.insert(3, 'changed_fields', '')
+            return changes.reindex(columns=self.change_columns)
+
+        is_new = ~current.index.isin(previous.index)
+        common = current.index[~is_new]
+
+        before = previous.loc[common, self.tracked_columns]
+        after = current.loc[common, self.tracked_columns]
+        changed_mask = self._comparable(after) != self._comparable(before)
+        changed_rows = changed_mask.any(axis=1)
+
+        field_names = np.array(self.tracked_columns, dtype=object)
+        changed_fields = [', '.join(field_names[row]) for row in changed_mask[changed_rows]]
+
+        updated = after[changed_rows].reset_index()
+        updated.insert(2, 'change', 'changed')
+        updated.insert(3, 'changed_fields', changed_fields)
+        for column in self.tracked_columns:
+            updated[f'{column}_previous'] = before[column].to_numpy()[changed_rows]
+
+        added = current[is_new].reset_index()
+        added.insert(2, 'change', 'new')
+        added.insert(3, 'changed_fields', '')
+
+        changes = pd.concat([added, updated], ignore_index=True)
+        return changes.reindex(columns=self.change_columns)
+
+    def update(self, board_key, snapshot):
+        """
+        Diff a new board snapshot against the last one, persist the changes and keep the snapshot
+
+        Returns:
+        - DataFrame of the changes (empty if nothing changed)
+        """
+        with self._lock:
+            previous = self._previous(board_key)
+            changes = self.diff(previous, snapshot)
+
+            keyed = self._keyed(snapshot)
+            self._snapshots[board_key] = keyed
+            try:
+                keyed.to_pickle(self._snapshot_path(board_key))
+            except Exception as e:
+                print(f"Error writing flight snapshot for {board_key}: {e}")
+
+            if not changes.empty:
+                changes.insert(0, 'detected_at', datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+                path = self.changes_path(board_key)
+                changes.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+        print(f"Flight board {board_key}: {len(changes)} changes out of {len(keyed)} flights")
+        return changes
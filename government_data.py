@@ -2,24 +2,105 @@ import requests
 import pandas as pd
 import json
 import os
+import threading
 from datetime import datetime
+from response_cache import cached
+from http_session import http_get
+from concurrent_pager import iter_pages
+from fda_mirror import FDARecallMirror
+from recall_index import RecallSearchIndex
+from fda_query import FDAQueryPlanner
+import config
+
+FDA_ENFORCEMENT_URL = "https://api.fda.gov/food/enforcement.json"
 
 class GovernmentDataClient:
     
     def __init__(self, api_key=None):
         self.api_key = api_key
         self.base_url = "https://api.data.gov/"
+        self._recall_mirror = None
+        self._recall_index = None
+        self.query_planner = FDAQueryPlanner()
+        self._mirror_lock = threading.RLock()
+    
+    def get_recall_mirror(self):
+        if self._recall_mirror is None:
+            db_path = os.path.join(os.getcwd(), config.DATA_DIR, config.FDA_MIRROR_DB)
+            self._recall_mirror = FDARecallMirror(db_path)
+        return self._recall_mirror
+    
+    def sync_fda_mirror(self, force=False, progress_callback=None):
+        """
+        Bring the local FDA enforcement mirror up to date
+
+        A mirror that has never been seeded first receives the newest
+        FDA_MIRROR_INITIAL_RECORDS recalls. After that, only records whose report_date is on or after
+        the stored watermark are requested. Syncs are skipped if the last
+        one finished less than FDA_MIRROR_SYNC_INTERVAL seconds ago.
+
+        Returns:
+        - The mirror, or None if it is unavailable and still empty
+        """
+        with self._mirror_lock:
+            try:
+                mirror = self.get_recall_mirror()
+                
+                if not force and not mirror.needs_sync(config.FDA_MIRROR_SYNC_INTERVAL):
+                    return mirror
+                
+                watermark = mirror.watermark()
+                seeded = mirror.is_seeded()
+                
+                if seeded and watermark:
+                    print(f"Syncing FDA recall mirror from report date {watermark}...")
+                    if progress_callback:
+                        progress_callback(f"Checking for FDA recalls reported since {watermark}...")
+                    batches = self.iter_fda_recall_batches(
+                        total=config.FDA_MIRROR_MAX_SYNC_RECORDS,
+                        max_workers=1,
+                        search=f"report_date:[{watermark} TO 29991231]",
+                        sort='report_date:asc'
+                    )
+                else:
+                    print("Seeding FDA recall mirror...")
+                    batches = self.iter_fda_recall_batches(total=config.FDA_MIRROR_INITIAL_RECORDS)
+                
+                added = 0
+                fetched = 0
+                for batch_results in batches:
+                    added += mirror.upsert(batch_results)
+                    fetched += len(batch_results)
+                    if progress_callback:
+                        progress_callback(f"Updating local FDA recall mirror... ({fetched} records downloaded)")
+                
+                if not seeded:
+                    mirror.mark_seeded()
+                mirror.mark_synced()
+                print(f"FDA recall mirror synced: {added} new records, {mirror.count()} total")
+                return mirror
+            
+            except Exception as e:
+                print(f"Error syncing FDA recall mirror: {e}")
+                if self._recall_mirror is not None and self._recall_mirror.count() > 0:
+                    return self._recall_mirror
+                return None
     
     def get_fda_food_recalls(self, limit=25, skip=0):
+        mirror = self.sync_fda_mirror()
+        if mirror is not None:
+            records = mirror.latest(limit=limit, skip=skip)
+            if records:
+                return pd.DataFrame(records)
+        
         try:
-            url = "https://api.fda.gov/food/enforcement.json"
             params = {
                 'limit': limit,
                 'skip': skip,
                 'sort': 'recall_initiation_date:desc'
             }
             
-            response = requests.get(url, params=params)
+            response = http_get(FDA_ENFORCEMENT_URL, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -33,6 +114,7 @@ class GovernmentDataClient:
             print(f"Error fetching FDA food recalls: {e}")
             return pd.DataFrame()
     
+    @cached("government", ttl=config.REFERENCE_CACHE_DURATION)
     def get_census_population_data(self, year=2019, state=None):
         try:
             url = "https://api.census.gov/data/2019/pep/population"
@@ -42,7 +124,7 @@ class GovernmentDataClient:
                 'for': 'state:*' if state is None else f'state:{state}'
             }
             
-            response = requests.get(url, params=params)
+            response = http_get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -57,6 +139,7 @@ class GovernmentDataClient:
             print(f"Error fetching Census population data: {e}")
             return pd.DataFrame()
     
+    @cached("government", ttl=config.REFERENCE_CACHE_DURATION)
     def get_crime_data_by_city(self, city):
         try:
             city_to_state = {
@@ -115,12 +198,12 @@ class GovernmentDataClient:
             print(f"Agency API params: {params}")
             
             try:
-                response = requests.get(agency_url, params=params, timeout=10)
+                response = http_get(agency_url, params=params, timeout=10)
                 
                 if not response.ok and response.status_code == 403:
                     alt_url = f"{agency_url}?api_key={api_key}"
                     print(f"Trying alternative URL approach: {alt_url}")
-                    response = requests.get(alt_url, timeout=10)
+                    response = http_get(alt_url, timeout=10)
                 
                 print(f"Agency API response status: {response.status_code}")
                 if not response.ok:
@@ -179,13 +262,13 @@ class GovernmentDataClient:
             print(f"Crime API params: {crime_params}")
             
             try:
-                crime_response = requests.get(crime_url, params=crime_params, timeout=10)
+                crime_response = http_get(crime_url, params=crime_params, timeout=10)
                 
                 if not crime_response.ok and crime_response.status_code == 403:
                     current_year = datetime.now().year
                     alt_crime_url = f"{crime_url}?api_key={api_key}&from=2016&to={str(min(current_year - 1, 2022))}&type=count"
                     print(f"Trying alternative crime URL approach: {alt_crime_url}")
-                    crime_response = requests.get(alt_crime_url, timeout=10)
+                    crime_response = http_get(alt_crime_url, timeout=10)
                 
                 print(f"Crime API response status: {crime_response.status_code}")
                 if not crime_response.ok:
@@ -230,146 +313,173 @@ class GovernmentDataClient:
             print(f"Error fetching crime data for {city}: {e}")
             return pd.DataFrame()
 
-    def search_fda_food_recalls(self, search_term, max_results=100):
+    def iter_fda_recall_batches(self, total=10000, batch_size=1000, max_workers=None,
+                                search=None, sort='recall_initiation_date:desc'):
+        """
+        Download FDA food enforcement records in skip-ordered batches
+
+        At most max_workers batches are in flight at once. Batches are
+        yielded in skip order as soon as each one is ready, so callers can
+        start processing before the last page lands. Iteration stops after the
+        first short or empty batch; a failed batch raises from next().
+        """
+        batches = iter_pages(
+            lambda skip: self._fetch_fda_batch(skip, batch_size, search, sort),
+            range(0, total, batch_size),
+            max_workers or config.FDA_MAX_WORKERS,
+            thread_name_prefix="fda-pager"
+        )
         try:
-            search_term = search_term.strip()
-            search_term_lower = search_term.lower()
+            for batch_results in batches:
+                yield batch_results
+                
+                if len(batch_results) < batch_size:
+                    print("Reached end of available recall data")
+                    break
+        finally:
+            batches.close()
+    
+    def _fetch_fda_batch(self, skip, limit, search=None, sort='recall_initiation_date:desc'):
+        print(f"Fetching recalls batch {skip//limit + 1} (records {skip} to {skip + limit})...")
+        
+        params = {
+            'limit': limit,
+            'skip': skip,
+            'sort': sort
+        }
+        if search:
+            params['search'] = search
+        
+        response = http_get(FDA_ENFORCEMENT_URL, params=params, timeout=15)
+        
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        
+        return response.json().get('results', [])
+    
+    def _search_fda_server(self, search_term, max_results, progress_callback=None):
+        """
+        Push the search down to openFDA, one small request per planned tier
+
+        Hits are added to the local mirror. Stops as soon as max_results
+        distinct recalls have been found.
+        """
+        results = []
+        seen = set()
+        
+        for tier, expression in self.query_planner.plan(search_term):
+            if progress_callback:
+                progress_callback(f"Searching openFDA for '{search_term}' ({tier} match)...")
             
-            print(f"Searching for FDA recalls containing: '{search_term}'")
+            try:
+                tier_results = self._fetch_fda_batch(0, min(max_results, 1000), search=expression)
+            except Exception as e:
+                print(f"Error in openFDA {tier} search: {e}")
+                break
             
-            all_results = []
-            total_to_search = 10000
-            batch_size = 1000
+            print(f"openFDA {tier} search returned {len(tier_results)} recalls")
             
-            for skip in range(0, total_to_search, batch_size):
-                try:
-                    print(f"Fetching recalls batch {skip//batch_size + 1} (records {skip} to {skip + batch_size})...")
-                    
-                    url = "https://api.fda.gov/food/enforcement.json"
-                    params = {
-                        'limit': batch_size,
-                        'skip': skip,
-                        'sort': 'recall_initiation_date:desc'
-                    }
-                    
-                    response = requests.get(url, params=params, timeout=15)
-                    
-                    if response.ok and 'results' in response.json():
-                        batch_results = response.json()['results']
-                        all_results.extend(batch_results)
-                        print(f"Retrieved {len(batch_results)} recalls in batch {skip//batch_size + 1}")
-                        
-                        if len(batch_results) < batch_size:
-                            print(f"Reached end of available recall data after {len(all_results)} total records")
-                            break
-                    else:
-                        print(f"Error fetching batch {skip//batch_size + 1}: {response.status_code}")
-                        if skip > 0:
-                            break
-                        else:
-                            print("Failed to retrieve any recall data. FDA API may be unavailable.")
-                            return pd.DataFrame()
-                
-                except Exception as e:
-                    print(f"Error in batch {skip//batch_size + 1}: {e}")
-                    break
+            try:
+                self.get_recall_mirror().upsert(tier_results)
+            except Exception as e:
+                print(f"Error storing openFDA search results: {e}")
             
-            print(f"Retrieved total of {len(all_results)} recalls for local searching")
+            for result in tier_results:
+                record_id = RecallSearchIndex.record_id(result)
+                if record_id not in seen:
+                    seen.add(record_id)
+                    results.append(result)
             
-            if not all_results:
-                print("No FDA recall data available")
-                return pd.DataFrame()
+            if len(results) >= max_results:
+                break
+        
+        return results
+    
+    def get_recall_index(self, mirror):
+        """Search index over the mirror, updated with records written since the last call"""
+        with self._mirror_lock:
+            if self._recall_index is None:
+                self._recall_index = RecallSearchIndex()
+            
+            last_rowid, records = mirror.records_after(self._recall_index.last_rowid)
+            if records:
+                print(f"Indexing {len(records)} FDA recall records")
+                self._recall_index.add(records)
+                self._recall_index.last_rowid = last_rowid
+            
+            return self._recall_index
+    
+    def _download_recall_index(self, progress_callback=None):
+        total_to_search = 10000
+        batch_size = 1000
+        
+        index = RecallSearchIndex()
+        batches = self.iter_fda_recall_batches(total=total_to_search, batch_size=batch_size)
+        batch_number = 0
+        
+        while True:
+            try:
+                batch_results = next(batches)
+            except StopIteration:
+                break
+            except Exception as e:
+                print(f"Error in batch {batch_number + 1}: {e}")
+                if batch_number > 0:
+                    break
+                print("Failed to retrieve any recall data. FDA API may be unavailable.")
+                return None
+            
+            batch_number += 1
+            index.add(batch_results)
+            print(f"Retrieved {len(batch_results)} recalls in batch {batch_number}")
+            if progress_callback:
+                progress_callback(f"Downloading FDA recalls... ({len(index)} records indexed)")
+        
+        print(f"Retrieved total of {len(index)} recalls for local searching")
+        return index
+    
+    def search_fda_food_recalls(self, search_term, max_results=100, progress_callback=None):
+        try:
+            search_term = search_term.strip()
             
-            print(f"Searching locally for '{search_term}'...")
-            matching_results = []
+            print(f"Searching for FDA recalls containing: '{search_term}'")
             
-            search_fields = ['product_description', 'reason_for_recall', 'recalling_firm', 
-                             'classification', 'code_info', 'product_quantity']
+            server_results = self._search_fda_server(search_term, max_results, progress_callback)
+            if len(server_results) >= max_results:
+                result_df = pd.DataFrame(server_results[:max_results])
+                print(f"Returning {len(result_df)} FDA recall results from openFDA search")
+                return result_df
             
-            for result in all_results:
-                found = False
-                
-                for field in search_fields:
-                    if field in result and search_term_lower in str(result[field]).lower():
-                        matching_results.append(result)
-                        found = True
-                        break
+            mirror = self.sync_fda_mirror(progress_callback=progress_callback)
             
-            print(f"Found {len(matching_results)} exact matches")
+            if mirror is not None:
+                print("Searching local FDA recall mirror")
+                index = self.get_recall_index(mirror)
+            else:
+                index = self._download_recall_index(progress_callback)
             
-            if len(matching_results) < max_results and ' ' in search_term_lower:
-                words = search_term_lower.split()
-                print(f"Trying word-based search with: {words}")
-                
-                for result in all_results:
-                    if result in matching_results:
-                        continue
-                    
-                    word_matches = 0
-                    for field in search_fields:
-                        if field in result:
-                            field_text = str(result[field]).lower()
-                            for word in words:
-                                if word in field_text:
-                                    word_matches += 1
-                    
-                    if word_matches > 0:
-                        result['_match_score'] = word_matches
-                        matching_results.append(result)
-                
-                seen = set()
-                unique_results = []
-                for result in matching_results:
-                    if 'id' in result:
-                        identifier = result['id']
-                    else:
-                        identifier = f"{result.get('product_description', '')}_{result.get('recall_initiation_date', '')}"
-                    
-                    if identifier not in seen:
-                        seen.add(identifier)
-                        unique_results.append(result)
-                
-                matching_results = unique_results
-                
-                matching_results.sort(key=lambda x: x.get('_match_score', 0), reverse=True)
-                
-                print(f"Found {len(matching_results)} matches after word-based search")
+            if index is None or len(index) == 0:
+                if server_results:
+                    return pd.DataFrame(server_results)
+                print("No FDA recall data available")
+                return pd.DataFrame()
             
-            if len(matching_results) < max_results:
-                print("Trying substring matching...")
-                for result in all_results:
-                    if result in matching_results:
-                        continue
-                    
-                    for field in search_fields:
-                        if field in result:
-                            field_text = str(result[field]).lower()
-                            
-                            if len(search_term_lower) > 3 and any(search_term_lower[i:i+4] in field_text for i in range(len(search_term_lower) - 3)):
-                                matching_results.append(result)
-                                break
-                
-                seen = set()
-                unique_results = []
-                for result in matching_results:
-                    if 'id' in result:
-                        identifier = result['id']
-                    else:
-                        identifier = f"{result.get('product_description', '')}_{result.get('recall_initiation_date', '')}"
-                    
-                    if identifier not in seen:
-                        seen.add(identifier)
-                        unique_results.append(result)
-                
-                matching_results = unique_results
-                print(f"Found {len(matching_results)} matches after substring matching")
+            print(f"Searching {len(index)} recalls for '{search_term}'...")
+            if progress_callback:
+                progress_callback(f"Searching {len(index)} FDA recalls for '{search_term}'...")
+            
+            matching_results = list(server_results)
+            seen = {RecallSearchIndex.record_id(result) for result in matching_results}
+            for result in index.search(search_term, max_results=max_results):
+                if len(matching_results) >= max_results:
+                    break
+                if RecallSearchIndex.record_id(result) not in seen:
+                    seen.add(RecallSearchIndex.record_id(result))
+                    matching_results.append(result)
             
             if matching_results:
-                for result in matching_results:
-                    if '_match_score' in result:
-                        del result['_match_score']
-                
-                result_df = pd.DataFrame(matching_results[:max_results])
+                result_df = pd.DataFrame(matching_results)
                 print(f"Returning {len(result_df)} FDA recall results")
                 return result_df
             
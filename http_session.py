@@ -0,0 +1,129 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+
+
+class RateLimiter:
+    """Spaces calls at least 1 / rate seconds apart across all threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PooledSession(requests.Session):
+    """requests.Session that applies a default timeout and optional rate limit to every request"""
+
+    def __init__(self, timeout, rate_limiter=None):
+        super().__init__()
+        self.default_timeout = timeout
+        self.rate_limiter = rate_limiter
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+        return super().request(method, url, **kwargs)
+
+
+class HTTPSessionPool:
+    """
+    Keep-alive sessions shared by every API client, one per host
+
+    Each host gets its own connection pool sized from pool_sizes, a
+    default timeout, and retries with exponential backoff on the
+    configured statuses. Once retries run out the last response is
+    returned as-is, so callers keep their own status code handling.
+    Hosts listed in rate_limits (requests per second) are throttled
+    across every thread sharing the pool.
+    """
+
+    def __init__(self, pool_sizes=None, default_pool_size=4, timeout=15, retries=3,
+                 backoff_factor=0.5, retry_statuses=(429, 500, 502, 503, 504), retry_status_overrides=None, rate_limits=None):
+        self.pool_sizes = pool_sizes or {}
+        self.default_pool_size = default_pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.retry_statuses = retry_statuses
+        self.retry_status_overrides = retry_status_overrides or {}
+        self.rate_limits = rate_limits or {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        host = urlsplit(url).hostname or url
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._create_session(host)
+                self._sessions[host] = session
+            return session
+
+    def _create_session(self, host):
+        pool_size = self.pool_sizes.get(host, self.default_pool_size)
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.retry_status_overrides.get(host, self.retry_statuses),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        rate = self.rate_limits.get(host)
+        session = PooledSession(self.timeout, RateLimiter(rate) if rate else None)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session_for(url).get(url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_http_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = HTTPSessionPool(
+                pool_sizes=config.HTTP_POOL_SIZES,
+                default_pool_size=config.HTTP_DEFAULT_POOL_SIZE,
+                timeout=config.HTTP_TIMEOUT,
+                retries=config.HTTP_RETRIES,
+                backoff_factor=config.HTTP_BACKOFF_FACTOR,
+                retry_statuses=config.HTTP_RETRY_STATUSES,
+                retry_status_overrides=config.HTTP_RETRY_STATUS_OVERRIDES,
+                rate_limits=config.HTTP_RATE_LIMITS
+            )
+        return _shared_pool
+
+
+def http_get(url, **kwargs):
+    return get_http_pool().get(url, **kwargs)
@@ -1,14 +1,94 @@
 import requests
 from newsapi import NewsApiClient
+from newsapi.newsapi_exception import NewsAPIException
 import pandas as pd
 import json
+import math
 import os
+import re
+from datetime import datetime, timedelta, timezone
+from response_cache import cached
+from http_session import get_http_pool
+from concurrent_pager import iter_pages
+from news_watch import NewsWatchStore
+import config
+
+
+def normalize_articles(articles):
+    """
+    Build a DataFrame from NewsAPI articles
+
+    The nested source objects are flattened into source_id and
+    source_name in a single pass, publishedAt is parsed to UTC datetime64
+    and source_name is stored as a category, since a few outlets repeat
+    across many rows.
+
+    Returns:
+    - DataFrame with the article fields followed by source_id and source_name
+    """
+    if not articles:
+        return pd.DataFrame()
+    
+    df = pd.DataFrame(articles)
+    sources = df.pop('source') if 'source' in df.columns else [None] * len(df)
+    sources = [source if isinstance(source, dict) else {} for source in sources]
+    
+    df['source_id'] = [source.get('id') for source in sources]
+    df['source_name'] = pd.Categorical([source.get('name') for source in sources])
+    if 'publishedAt' in df.columns:
+        df['publishedAt'] = pd.to_datetime(df['publishedAt'], utc=True, errors='coerce', format='ISO8601')
+    
+    return df
+
+
+QUERY_OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+def _uses_query_syntax(query):
+    """True if the query has quoted phrases, grouping, +/- prefixes or AND/OR/NOT"""
+    return (any(char in query for char in '"()')
+            or any(word in QUERY_OPERATORS or word[:1] in '+-' for word in query.split()))
+
+
+def title_query(query):
+    """
+    NewsAPI query matching any of the query's words
+
+    Queries already written in NewsAPI syntax are passed through unchanged.
+    """
+    if _uses_query_syntax(query):
+        return query
+    return ' OR '.join(query.split())
+
+
+def title_matcher(query):
+    """
+    Compiled case-insensitive pattern matching any of the query's terms as a whole word
+
+    Quoted phrases count as one term; operators and excluded (-term) words are skipped.
+    A word boundary is only required on a side of a term that is a word
+    character, so terms like "c++" still match. A query with no terms
+    matches nothing.
+    """
+    terms = re.findall(r'"([^"]+)"|(\S+)', query)
+    terms = [phrase or word.strip('()').lstrip('+') for phrase, word in terms
+             if phrase or (word not in QUERY_OPERATORS and not word.startswith('-'))]
+    patterns = [
+        (r'\b' if re.match(r'\w', term) else '') + re.escape(term) + (r'\b' if re.search(r'\w$', term) else '')
+        for term in terms if term
+    ]
+    if not patterns:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(patterns), re.IGNORECASE)
+
 
 class NewsAPIClient:
     def __init__(self, api_key):
         self.api_key = api_key
-        self.newsapi = NewsApiClient(api_key=api_key)
+        self.newsapi = NewsApiClient(api_key=api_key, session=get_http_pool().session_for("https://newsapi.org"))
+        self._watch_store = None
     
+    @cached("news")
     def get_top_headlines(self, country='us', category=None, query=None, page_size=10):
         try:
             params = {'country': country, 'page_size': page_size}
@@ -24,19 +104,13 @@ class NewsAPIClient:
             if not articles:
                 return pd.DataFrame()
             
-            df = pd.DataFrame(articles)
-            
-            if 'source' in df.columns:
-                df['source_id'] = df['source'].apply(lambda x: x.get('id'))
-                df['source_name'] = df['source'].apply(lambda x: x.get('name'))
-                df.drop('source', axis=1, inplace=True)
-                
-            return df
+            return normalize_articles(articles)
         
         except Exception as e:
             print(f"Error fetching news: {e}")
             return pd.DataFrame()
     
+    @cached("news")
     def get_everything(self, query, language='en', sort_by='publishedAt', page_size=10, from_date=None, to_date=None):
         try:
             params = {
@@ -58,23 +132,193 @@ class NewsAPIClient:
             if not articles:
                 return pd.DataFrame()
             
-            df = pd.DataFrame(articles)
-            
-            if 'source' in df.columns:
-                df['source_id'] = df['source'].apply(lambda x: x.get('id'))
-                df['source_name'] = df['source'].apply(lambda x: x.get('name'))
-                df.drop('source', axis=1, inplace=True)
+            return normalize_articles(articles)
+        
+        except Exception as e:
+            print(f"Error searching news: {e}")
+            return pd.DataFrame()
+    
+    def iter_everything_pages(self, target_count=100, page_size=None, max_workers=None, **params):
+        """
+        Fetch /everything result pages, yielding each page's articles in page order
+
+        The first page's totalResults decides how many more pages to ask
+        for, never past target_count or NEWSAPI_MAX_RESULTS, the plan's
+        result ceiling. The rest are fetched concurrently, at most
+        max_workers at a time. Iteration stops after a short page or when
+        NewsAPI reports the ceiling was reached.
+        """
+        wanted = min(target_count, config.NEWSAPI_MAX_RESULTS)
+        page_size = min(page_size or config.NEWSAPI_PAGE_SIZE, wanted, 100)
+        max_workers = max_workers or config.NEWSAPI_PAGE_WORKERS
+        
+        first = self.newsapi.get_everything(page=1, page_size=page_size, **params)
+        articles = first.get('articles') or []
+        yield articles
+        
+        total = min(first.get('totalResults') or 0, wanted)
+        if len(articles) < page_size or total <= page_size:
+            return
+        
+        print(f"Paging news results: {first.get('totalResults')} available, fetching up to {total}")
+        
+        responses = iter_pages(
+            lambda page: self.newsapi.get_everything(page=page, page_size=page_size, **params),
+            range(2, math.ceil(total / page_size) + 1),
+            max_workers,
+            thread_name_prefix="news-pager"
+        )
+        try:
+            for response in responses:
+                page_articles = response.get('articles') or []
+                yield page_articles
                 
-            return df
+                if len(page_articles) < page_size:
+                    break
+        except NewsAPIException as e:
+            if e.get_code() != 'maximumResultsReached':
+                raise
+            print("Reached the plan's result limit")
+        finally:
+            responses.close()
+    
+    @staticmethod
+    def _everything_params(query, language='en', sort_by='publishedAt', from_date=None, to_date=None,
+                           title_only=False):
+        params = {
+            'q': query,
+            'language': language,
+            'sort_by': sort_by
+        }
+        
+        if title_only:
+            params['qintitle'] = title_query(query)
+        if from_date:
+            params['from_param'] = from_date
+        if to_date:
+            params['to'] = to_date
+        return params
+    
+    @cached("news")
+    def get_everything_paged(self, query, target_count=100, language='en', sort_by='publishedAt',
+                             from_date=None, to_date=None, progress_callback=None, title_only=False):
+        """
+        Search all articles across as many result pages as target_count needs
+
+        With title_only, articles must also have one of the query's words
+        in their title, through qInTitle. Articles are deduplicated by URL. progress_callback, if given,
+        receives the articles collected so far as a DataFrame after each
+        page. If a later page fails, the articles already collected are
+        returned.
+
+        Returns:
+        - DataFrame of up to target_count articles
+        """
+        params = self._everything_params(query, language, sort_by, from_date, to_date, title_only)
+        
+        articles = []
+        seen_urls = set()
+        pages = self.iter_everything_pages(target_count=target_count, **params)
+        try:
+            for page_articles in pages:
+                for article in page_articles:
+                    url = article.get('url')
+                    if url and url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                    articles.append(article)
+                
+                if progress_callback and articles:
+                    progress_callback(normalize_articles(articles[:target_count]))
+                
+                if len(articles) >= target_count:
+                    break
         
         except Exception as e:
             print(f"Error searching news: {e}")
+        
+        finally:
+            pages.close()
+        
+        if not articles:
             return pd.DataFrame()
+        
+        return normalize_articles(articles[:target_count])
+    
+    def get_watch_store(self):
+        if self._watch_store is None:
+            self._watch_store = NewsWatchStore(os.path.join(os.getcwd(), config.DATA_DIR, config.NEWS_WATCH_DIR))
+        return self._watch_store
     
+    def watch_query(self, query, days_back=7, language='en', title_only=False):
+        """
+        Poll a watched query for articles published since its last poll
+
+        The query's first poll covers the last days_back days. Later polls
+        only request articles from the watermark onwards and append the
+        ones not seen before to the query's dataset.
+
+        Results come newest first and are capped per request, so a full
+        batch is followed by another ending at its oldest publishedAt,
+        back to the watermark. The watermark only moves forward once the
+        whole window was fetched; after a failed or stalled poll the next
+        one covers the same window again.
+
+        Returns:
+        - (new articles, full dataset) DataFrames
+        """
+        store = self.get_watch_store()
+        key = store.query_key(query, language, title_only)
+        
+        watermark = store.watermark(key)
+        if watermark is not None:
+            from_date = watermark.strftime('%Y-%m-%dT%H:%M:%S')
+        else:
+            from_date = (datetime.now(timezone.utc) - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        print(f"Polling watched query '{query}' from {from_date}")
+        
+        params = self._everything_params(query, language, 'publishedAt', from_date, title_only=title_only)
+        batch_limit = min(config.NEWS_WATCH_MAX_ARTICLES, config.NEWSAPI_MAX_RESULTS)
+        fetched = []
+        complete = False
+        try:
+            while True:
+                batch = [article for page in self.iter_everything_pages(target_count=batch_limit, **params)
+                         for article in page]
+                fetched.extend(batch)
+                if len(batch) < batch_limit:
+                    complete = True
+                    break
+                
+                oldest = min((article.get('publishedAt') for article in batch if article.get('publishedAt')), default=None)
+                if oldest is None or oldest == params.get('to'):
+                    print(f"Watched query '{query}' has more than {batch_limit} articles at {oldest}, leaving its watermark")
+                    break
+                print(f"Watched query '{query}' returned a full batch, fetching articles up to {oldest}")
+                params['to'] = oldest
+        
+        except Exception as e:
+            print(f"Error polling watched query '{query}': {e}")
+        
+        articles = normalize_articles(fetched)
+        new_articles, dataset = store.append(key, articles)
+        if complete and not articles.empty:
+            store.set_watermark(key, articles['publishedAt'].max())
+        print(f"Watched query '{query}': {len(new_articles)} new articles, {len(dataset)} stored")
+        return new_articles, dataset
+    
+    @cached("news")
     def get_everything_in_title(self, query, language='en', sort_by='publishedAt', page_size=100, from_date=None, to_date=None):
+        """
+        Search for articles with any of the query's words in their title
+
+        The full-text query is sent as q and the title restriction is pushed
+        to NewsAPI with qInTitle, so only matching articles are downloaded.
+        If NewsAPI rejects the title query, the q results are filtered
+        locally instead.
+        """
         try:
             params = {
-                'q': query,
                 'language': language,
                 'sort_by': sort_by,
                 'page_size': page_size
@@ -85,37 +329,36 @@ class NewsAPIClient:
             if to_date:
                 params['to'] = to_date
             
-            response = self.newsapi.get_everything(**params)
+            try:
+                response = self.newsapi.get_everything(q=query, qintitle=title_query(query), **params)
+                filter_locally = False
+            except NewsAPIException as e:
+                print(f"Title search rejected by NewsAPI ({e.get_message()}), filtering titles locally")
+                response = self.newsapi.get_everything(q=query, **params)
+                filter_locally = True
             
             articles = response['articles']
             
             if not articles:
                 return pd.DataFrame()
             
-            df = pd.DataFrame(articles)
+            df = normalize_articles(articles)
             
-            if 'title' in df.columns:
-                query_terms = query.lower().split()
-                filtered_df = df[df['title'].str.lower().apply(
-                    lambda title: any(term in title.lower() for term in query_terms)
-                )]
+            if filter_locally and 'title' in df.columns:
+                df = df[df['title'].str.contains(title_matcher(query), na=False)].reset_index(drop=True)
                 
-                if filtered_df.empty:
+                if df.empty:
                     return pd.DataFrame()
                 
-                df = filtered_df
+                df['source_name'] = df['source_name'].cat.remove_unused_categories()
             
-            if 'source' in df.columns:
-                df['source_id'] = df['source'].apply(lambda x: x.get('id'))
-                df['source_name'] = df['source'].apply(lambda x: x.get('name'))
-                df.drop('source', axis=1, inplace=True)
-                
             return df
         
         except Exception as e:
             print(f"Error searching news in titles: {e}")
             return pd.DataFrame()
     
+    @cached("news", ttl=config.REFERENCE_CACHE_DURATION)
     def get_sources(self, category=None, language='en', country=None):
         try:
             params = {'language': language}
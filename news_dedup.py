@@ -0,0 +1,301 @@
+import os
+import pickle
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import config
+
+HASH_MASK = np.uint64(0xFFFFFFFF)
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index that assigns near-duplicate articles to clusters
+
+    Each article's title and description are reduced to a MinHash
+    signature of character shingles. Signatures are split into bands and
+    bucketed, so a new article is only compared with articles that share
+    a band bucket rather than with the whole history. It joins the
+    cluster of the most similar candidate if their estimated Jaccard
+    similarity reaches threshold, otherwise it starts a new cluster.
+    Cluster ids are stable integers, and an article URL seen before keeps
+    its cluster. Each article keeps its publish time, so articles past a
+    maximum age can be expired from the buckets and the URL map, keeping
+    the index bounded.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.5, shingle_size=5, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.cluster_count = 0
+        self.dirty = False
+
+        self._a = rng.integers(1, 2 ** 32, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = np.zeros((64, num_perm), dtype=np.uint32)
+        self._doc_clusters = []
+        self._doc_times = []
+        self._url_clusters = {}
+        self._url_times = {}
+        self._last_expiry = time.time()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        now = time.time()
+        state.setdefault('_doc_times', [now] * len(state['_doc_clusters']))
+        state.setdefault('_url_times', dict.fromkeys(state['_url_clusters'], now))
+        state.setdefault('_last_expiry', now)
+        state['dirty'] = False
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_clusters)
+
+    def shingles(self, text):
+        text = ' '.join(re.findall(r'\w+', str(text).lower()))
+        if len(text) <= self.shingle_size:
+            return {text} if text else set()
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, text):
+        """
+        MinHash signature of the text's shingles
+
+        Returns:
+        - uint32 array of num_perm values, or None for text with no words
+        """
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) & HASH_MASK
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _add(self, signature, url, published):
+        """Cluster one article and index it; expects the lock to be held"""
+        if url and url in self._url_clusters:
+            return self._url_clusters[url]
+
+        cluster = None
+        if signature is not None:
+            keys = self._band_keys(signature)
+            candidates = set()
+            for band, key in enumerate(keys):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            if candidates:
+                candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+                similarity = (self._signatures[candidates] == signature).mean(axis=1)
+                best = similarity.argmax()
+                if similarity[best] >= self.threshold:
+                    cluster = self._doc_clusters[candidates[best]]
+
+        if cluster is None:
+            cluster = self.cluster_count
+            self.cluster_count += 1
+
+        if signature is not None:
+            doc = len(self._doc_clusters)
+            if doc == len(self._signatures):
+                self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+            self._signatures[doc] = signature
+            self._doc_clusters.append(cluster)
+            self._doc_times.append(published)
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(doc)
+            self.dirty = True
+
+        if url:
+            self._url_clusters[url] = cluster
+            self._url_times[url] = published
+            self.dirty = True
+        return cluster
+
+    def cluster_ids(self, texts, urls=None, published=None):
+        """
+        Cluster a batch of articles against the history and each other
+
+        published gives each article's publish time in epoch seconds and
+        defaults to now; it decides when the article expires.
+
+        Returns:
+        - int64 array of cluster ids, one per text
+        """
+        urls = urls if urls is not None else [None] * len(texts)
+        published = published if published is not None else [time.time()] * len(texts)
+        signatures = [self.signature(text) for text in texts]
+        with self._lock:
+            return np.array([self._add(signature, url, when)
+                             for signature, url, when in zip(signatures, urls, published)], dtype=np.int64)
+
+    def expire(self, max_age, min_interval=24 * 3600):
+        """
+        Drop articles published more than max_age seconds ago
+
+        Expiring rebuilds the buckets, so it runs at most once per
+        min_interval seconds.
+
+        Returns:
+        - Number of indexed articles dropped
+        """
+        now = time.time()
+        with self._lock:
+            if now - self._last_expiry < min_interval:
+                return 0
+            self._last_expiry = now
+            cutoff = now - max_age
+
+            stale_urls = [url for url, published in self._url_times.items() if published < cutoff]
+            for url in stale_urls:
+                del self._url_clusters[url]
+                del self._url_times[url]
+
+            times = np.asarray(self._doc_times, dtype=np.float64)
+            keep = np.flatnonzero(times >= cutoff)
+            dropped = len(times) - len(keep)
+            if dropped:
+                signatures = np.zeros((max(64, len(keep)), self.num_perm), dtype=np.uint32)
+                signatures[:len(keep)] = self._signatures[keep]
+                self._signatures = signatures
+                self._doc_clusters = [self._doc_clusters[doc] for doc in keep]
+                self._doc_times = times[keep].tolist()
+                self._buckets = [{} for _ in range(self.bands)]
+                for doc in range(len(keep)):
+                    for band, key in enumerate(self._band_keys(signatures[doc])):
+                        self._buckets[band].setdefault(key, []).append(doc)
+
+            if dropped or stale_urls:
+                self.dirty = True
+        return dropped
+
+    def save(self, path):
+        with self._lock:
+            data = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+            self.dirty = False
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+
+def article_text(news_data):
+    """Title and description of each article, joined into one string"""
+    text = pd.Series('', index=news_data.index, dtype=object)
+    for column in ('title', 'description'):
+        if column in news_data.columns:
+            text = text + ' ' + news_data[column].fillna('').astype(str)
+    return text
+
+
+def cluster_articles(news_data, index=None):
+    """
+    Add a cluster_id column grouping near-duplicate articles
+
+    Returns:
+    - Copy of news_data with cluster_id and copies (articles in the same cluster in this frame)
+    """
+    if news_data.empty:
+        return news_data
+
+    shared = index is None
+    if shared:
+        index = get_news_dedup_index()
+    urls = news_data['url'].tolist() if 'url' in news_data.columns else None
+
+    published = None
+    if 'publishedAt' in news_data.columns:
+        published_at = pd.to_datetime(news_data['publishedAt'], utc=True, errors='coerce')
+        published = (published_at - pd.Timestamp(0, tz='UTC')).dt.total_seconds().fillna(time.time()).tolist()
+
+    clustered = news_data.copy()
+    clustered['cluster_id'] = index.cluster_ids(article_text(news_data).tolist(), urls, published)
+    clustered['copies'] = clustered.groupby('cluster_id')['cluster_id'].transform('size')
+    if shared:
+        index.expire(config.NEWS_DEDUP_MAX_AGE)
+        save_news_dedup_index()
+    return clustered
+
+
+def dedupe_articles(news_data):
+    """
+    Keep the earliest published article of each cluster, in the frame's original order
+
+    Returns:
+    - DataFrame with one article per cluster_id
+    """
+    if news_data.empty or 'cluster_id' not in news_data.columns:
+        return news_data
+
+    ordered = news_data.sort_values('publishedAt', kind='stable') if 'publishedAt' in news_data.columns else news_data
+    keep = ordered.drop_duplicates(subset='cluster_id').index
+    deduped = news_data.loc[news_data.index.isin(keep)]
+    if 'source_name' in deduped.columns and isinstance(deduped['source_name'].dtype, pd.CategoricalDtype):
+        deduped = deduped.assign(source_name=deduped['source_name'].cat.remove_unused_categories())
+    return deduped
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def _index_path():
+    return os.path.join(os.getcwd(), config.DATA_DIR, config.NEWS_DEDUP_INDEX)
+
+
+def get_news_dedup_index():
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            path = _index_path()
+            try:
+                with open(path, "rb") as f:
+                    _shared_index = pickle.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error reading news dedup index {path}: {e}")
+
+            if _shared_index is None:
+                _shared_index = NearDuplicateIndex(
+                    num_perm=config.NEWS_MINHASH_PERMUTATIONS,
+                    bands=config.NEWS_LSH_BANDS,
+                    threshold=config.NEWS_DUPLICATE_THRESHOLD
+                )
+        return _shared_index
+
+
+def save_news_dedup_index():
+    """Write the shared index if articles were added or expired since it was last saved"""
+    if _shared_index is None or not _shared_index.dirty:
+        return
+    path = _index_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _shared_index.save(path)
+    except Exception as e:
+        _shared_index.dirty = True
+        print(f"Error writing news dedup index: {e}")
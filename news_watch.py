@@ -0,0 +1,109 @@
+import hashlib
+import os
+import re
+import threading
+
+import pandas as pd
+
+
+class NewsWatchStore:
+    """
+    Persistent article datasets for watched news queries
+
+    Each watched query keeps one pickled DataFrame under root_dir, and a
+    watermark file with the publishedAt up to which every article has been
+    fetched, so the next poll only asks NewsAPI for articles from then on.
+    The watermark is kept apart from the dataset because a truncated poll
+    stores articles without advancing it. Articles are appended once, by
+    URL.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self._datasets = {}
+        self._lock = threading.Lock()
+
+        if self.root_dir and not os.path.exists(self.root_dir):
+            os.makedirs(self.root_dir)
+
+    @staticmethod
+    def query_key(query, language='en', title_only=False):
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', query.lower()).strip('_')[:40] or 'query'
+        digest = hashlib.sha256(f"{query}|{language}|{title_only}".encode("utf-8")).hexdigest()[:10]
+        return f"{slug}_{digest}"
+
+    def _path(self, key):
+        return os.path.join(self.root_dir, f"{key}.pkl")
+
+    def _watermark_path(self, key):
+        return os.path.join(self.root_dir, f"{key}.watermark")
+
+    def _load(self, key):
+        dataset = self._datasets.get(key)
+        if dataset is None:
+            dataset = pd.DataFrame()
+            if os.path.exists(self._path(key)):
+                try:
+                    dataset = pd.read_pickle(self._path(key))
+                except Exception as e:
+                    print(f"Error reading watched news dataset {key}: {e}")
+            self._datasets[key] = dataset
+        return dataset
+
+    def load(self, key):
+        with self._lock:
+            return self._load(key)
+
+    def watermark(self, key):
+        """publishedAt up to which the query is fully fetched, or None before its first complete poll"""
+        try:
+            with open(self._watermark_path(key)) as f:
+                return pd.Timestamp(f.read().strip())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading watermark for watched query {key}: {e}")
+            return None
+
+    def set_watermark(self, key, published_at):
+        if pd.isna(published_at):
+            return
+        path = self._watermark_path(key)
+        with self._lock:
+            with open(f"{path}.tmp", "w") as f:
+                f.write(pd.Timestamp(published_at).isoformat())
+            os.replace(f"{path}.tmp", path)
+
+    def append(self, key, articles):
+        """
+        Add articles whose URL is not in the query's dataset yet and save it
+
+        Returns:
+        - (new articles, full dataset) DataFrames
+        """
+        with self._lock:
+            dataset = self._load(key)
+            if articles.empty:
+                return articles, dataset
+
+            new_articles = articles
+            if 'url' in articles.columns:
+                new_articles = articles.drop_duplicates(subset='url')
+                if 'url' in dataset.columns:
+                    new_articles = new_articles[~new_articles['url'].isin(dataset['url'])]
+            if new_articles.empty:
+                return new_articles, dataset
+
+            dataset = pd.concat([new_articles, dataset], ignore_index=True)
+            if 'source_name' in dataset.columns:
+                dataset['source_name'] = dataset['source_name'].astype('category')
+            if 'publishedAt' in dataset.columns:
+                dataset = dataset.sort_values('publishedAt', ascending=False, kind='stable', ignore_index=True)
+
+            path = self._path(key)
+            temp_path = f"{path}.tmp"
+            dataset.to_pickle(temp_path)
+            os.replace(temp_path, path)
+            self._datasets[key] = dataset
+
+        return new_articles, dataset
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+
+class QuotaLedger:
+    """
+    Persistent monthly call counts for a metered API, per API key
+
+    Calls are counted when they are reserved, before the request goes out,
+    so concurrent workers can't overshoot the budget between them. Keys
+    are stored as a short hash and months are UTC calendar months.
+    """
+
+    def __init__(self, db_path, service, monthly_budget):
+        self.db_path = db_path
+        self.service = service
+        self.monthly_budget = monthly_budget
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "service TEXT NOT NULL, "
+                "key_id TEXT NOT NULL, "
+                "month TEXT NOT NULL, "
+                "calls INTEGER NOT NULL DEFAULT 0, "
+                "exhausted INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (service, key_id, month))"
+            )
+
+    @staticmethod
+    def key_id(api_key):
+        return hashlib.sha256(str(api_key).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def current_month():
+        return datetime.now(timezone.utc).strftime('%Y-%m')
+
+    def _row(self, api_key):
+        row = self._connection.execute(
+            "SELECT calls, exhausted FROM usage WHERE service = ? AND key_id = ? AND month = ?",
+            (self.service, self.key_id(api_key), self.current_month())
+        ).fetchone()
+        return row or (0, 0)
+
+    def reserve(self, api_key):
+        """
+        Count one call against this month's budget if any is left
+
+        Returns:
+        - True if the call may go ahead, False if the budget is used up
+        """
+        with self._lock, self._connection:
+            calls, exhausted = self._row(api_key)
+            if exhausted or calls >= self.monthly_budget:
+                return False
+            self._connection.execute(
+                "INSERT INTO usage (service, key_id, month, calls) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (service, key_id, month) DO UPDATE SET calls = calls + 1",
+                (self.service, self.key_id(api_key), self.current_month())
+            )
+            return True
+
+    def mark_exhausted(self, api_key):
+        """Record that the API itself reported the quota as used up"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO usage (service, key_id, month, exhausted) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (service, key_id, month) DO UPDATE SET exhausted = 1",
+                (self.service, self.key_id(api_key), self.current_month())
+            )
+
+    def status(self, api_key):
+        with self._lock:
+            calls, exhausted = self._row(api_key)
+        remaining = 0 if exhausted else max(self.monthly_budget - calls, 0)
+        return {
+            'month': self.current_month(),
+            'used': calls,
+            'budget': self.monthly_budget,
+            'remaining': remaining,
+            'exhausted': bool(exhausted) or remaining == 0
+        }
+
+
+class RequestCoalescer:
+    """
+    Lets identical in-flight requests share one call
+
+    The first caller for a key runs the request; callers arriving while it
+    is in flight wait for and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, request):
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            print("Sharing result of identical in-flight request")
+            return future.result()
+
+        try:
+            result = request()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
@@ -0,0 +1,164 @@
+import re
+from collections import defaultdict
+
+SEARCH_FIELDS = ['product_description', 'reason_for_recall', 'recalling_firm',
+                 'classification', 'code_info', 'product_quantity']
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+class RecallSearchIndex:
+    """
+    Inverted index over the text fields of FDA enforcement records
+
+    Every lowercase alphanumeric token in the searched fields maps to the
+    set of records containing it. A query fragment is resolved by finding
+    the vocabulary tokens that contain it, which gives a small candidate
+    set; candidates are then checked with the same substring tests the
+    linear scan used, so results match the exact / word / 4-gram tiers.
+    """
+
+    def __init__(self, fields=None):
+        self.fields = fields or SEARCH_FIELDS
+        self.records = []
+        self._field_texts = []
+        self._joined_texts = []
+        self._alive = []
+        self._positions_by_id = {}
+        self._postings = defaultdict(set)
+        self._fragment_cache = {}
+        self.last_rowid = 0
+
+    def __len__(self):
+        return len(self._positions_by_id)
+
+    @staticmethod
+    def record_id(record):
+        if record.get('recall_number'):
+            return record['recall_number']
+        return f"{record.get('product_description', '')}_{record.get('recall_initiation_date', '')}"
+
+    def add(self, records):
+        """Index records, replacing any earlier record with the same recall id"""
+        for record in records:
+            record_id = self.record_id(record)
+            previous = self._positions_by_id.get(record_id)
+            if previous is not None:
+                self._alive[previous] = False
+
+            position = len(self.records)
+            field_texts = tuple(
+                str(record[field]).lower() if field in record else None
+                for field in self.fields
+            )
+
+            self.records.append(record)
+            self._field_texts.append(field_texts)
+            self._joined_texts.append('\x00'.join(text for text in field_texts if text is not None))
+            self._alive.append(True)
+            self._positions_by_id[record_id] = position
+
+            for token in set(TOKEN_PATTERN.findall(self._joined_texts[position])):
+                self._postings[token].add(position)
+
+        self._fragment_cache.clear()
+
+    def _positions_with_fragment(self, fragment):
+        positions = self._fragment_cache.get(fragment)
+        if positions is None:
+            positions = set()
+            for token, token_positions in self._postings.items():
+                if fragment in token:
+                    positions |= token_positions
+            self._fragment_cache[fragment] = positions
+        return positions
+
+    def _candidates(self, text):
+        """Positions that could contain text as a substring of one of their fields"""
+        fragments = TOKEN_PATTERN.findall(text)
+        if not fragments:
+            return set(range(len(self.records)))
+
+        fragments.sort(key=len, reverse=True)
+        candidates = set(self._positions_with_fragment(fragments[0]))
+        for fragment in fragments[1:]:
+            if not candidates:
+                break
+            candidates &= self._positions_with_fragment(fragment)
+        return candidates
+
+    def _in_order(self, positions):
+        alive = [position for position in positions if self._alive[position]]
+        alive.sort(key=lambda position: self.record_id(self.records[position]))
+        alive.sort(key=lambda position: str(self.records[position].get('recall_initiation_date', '')), reverse=True)
+        return alive
+
+    def _any_field_contains(self, position, text):
+        return any(field_text is not None and text in field_text for field_text in self._field_texts[position])
+
+    def exact_matches(self, term):
+        return self._in_order(
+            position for position in self._candidates(term)
+            if term in self._joined_texts[position]
+        )
+
+    def word_scores(self, words, exclude=()):
+        candidates = set()
+        for word in words:
+            candidates |= self._candidates(word)
+        candidates -= set(exclude)
+
+        scores = {}
+        for position in candidates:
+            if not self._alive[position]:
+                continue
+            score = 0
+            for field_text in self._field_texts[position]:
+                if field_text is not None:
+                    score += sum(1 for word in words if word in field_text)
+            if score > 0:
+                scores[position] = score
+        return scores
+
+    def gram_matches(self, term, gram_size=4, exclude=()):
+        if len(term) < gram_size:
+            return []
+
+        grams = {term[i:i + gram_size] for i in range(len(term) - gram_size + 1)}
+        candidates = set()
+        for gram in grams:
+            candidates |= self._candidates(gram)
+        candidates -= set(exclude)
+
+        return self._in_order(
+            position for position in candidates
+            if any(self._any_field_contains(position, gram) for gram in grams)
+        )
+
+    def search(self, search_term, max_results=100):
+        """
+        Run the exact, word and 4-gram tiers of the recall search
+
+        Returns:
+        - List of matching records, at most max_results long
+        """
+        search_term_lower = search_term.strip().lower()
+
+        matching = self.exact_matches(search_term_lower)
+        print(f"Found {len(matching)} exact matches")
+
+        if len(matching) < max_results and ' ' in search_term_lower:
+            words = search_term_lower.split()
+            print(f"Trying word-based search with: {words}")
+
+            scores = self.word_scores(words, exclude=matching)
+            matching = matching + self._in_order(scores)
+            matching.sort(key=lambda position: scores.get(position, 0), reverse=True)
+            print(f"Found {len(matching)} matches after word-based search")
+
+        if len(matching) < max_results:
+            print("Trying substring matching...")
+            matching = matching + self.gram_matches(search_term_lower, exclude=matching)
+            print(f"Found {len(matching)} matches after substring matching")
+
+        return [self.records[position] for position in matching[:max_results]]
@@ -1,6 +1,7 @@
 import praw
 import pandas as pd
 from datetime import datetime
+from response_cache import cached
 
 class RedditClient:
     def __init__(self, client_id, client_secret, user_agent):
@@ -14,6 +15,7 @@ class RedditClient:
             print(f"Error initializing Reddit client: {e}")
             raise
     
+    @cached("reddit")
     def search_posts(self, query="", subreddit=None, limit=25, sort='hot'):
         try:
             if subreddit:
@@ -68,6 +70,7 @@ class RedditClient:
             print(f"Error searching Reddit: {e}")
             return pd.DataFrame()
     
+    @cached("reddit")
     def get_subreddit_info(self, subreddit_name):
         try:
             subreddit = self.reddit.subreddit(subreddit_name)
@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from sync_state import SyncStateMixin
+
+# Columns broken out of each record for lookups, per table
+CATALOG_TABLES = {
+    'airports': {
+        'id': 'airport_id',
+        'name': 'airport_name',
+        'city': 'city_iata_code'
+    },
+    'airlines': {
+        'id': 'airline_id',
+        'name': 'airline_name',
+        'city': 'hub_code'
+    }
+}
+
+
+class ReferenceCatalog(SyncStateMixin):
+    """
+    Local SQLite copy of the AviationStack airports and airlines lists
+
+    Records are stored as JSON with IATA, ICAO, country and city (the
+    city IATA code for airports, the hub code for airlines) broken out and
+    indexed for lookups. A bulk sync can span several passes; the offset
+    it reached is kept in sync_state so the next pass resumes there.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            for table in CATALOG_TABLES:
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    "record_id TEXT PRIMARY KEY, "
+                    "iata_code TEXT, "
+                    "icao_code TEXT, "
+                    "name TEXT, "
+                    "country_name TEXT, "
+                    "city TEXT, "
+                    "record TEXT NOT NULL)"
+                )
+                for column in ('iata_code', 'icao_code', 'country_name', 'city'):
+                    self._connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column} COLLATE NOCASE)"
+                    )
+            self._create_sync_state_table()
+
+    @staticmethod
+    def _spec(table):
+        if table not in CATALOG_TABLES:
+            raise ValueError(f"Unknown reference table: {table}")
+        return CATALOG_TABLES[table]
+
+    def upsert(self, table, records):
+        """
+        Insert or replace records by their AviationStack id, or IATA/ICAO code when there is none
+
+        Returns:
+        - Number of records that were not in the catalog before
+        """
+        spec = self._spec(table)
+        rows = []
+        for record in records:
+            record_id = record.get(spec['id']) or record.get('id') or record.get('iata_code') or record.get('icao_code')
+            if not record_id:
+                continue
+            rows.append((
+                str(record_id),
+                record.get('iata_code') or None,
+                record.get('icao_code') or None,
+                record.get(spec['name']),
+                record.get('country_name'),
+                record.get(spec['city']) or None,
+                json.dumps(record)
+            ))
+
+        if not rows:
+            return 0
+
+        with self._lock, self._connection:
+            before = self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {table} (record_id, iata_code, icao_code, name, country_name, city, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            after = self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+        return after - before
+
+    def count(self, table):
+        self._spec(table)
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def find(self, table, iata_code=None, icao_code=None, country=None, city=None, limit=None, offset=0):
+        """
+        Records matching all given filters, case-insensitively, ordered by name
+
+        Returns:
+        - List of record dicts as the API returned them
+        """
+        self._spec(table)
+        filters = {'iata_code': iata_code, 'icao_code': icao_code, 'country_name': country, 'city': city}
+        clauses = [f"{column} = ? COLLATE NOCASE" for column, value in filters.items() if value]
+        params = [value for value in filters.values() if value]
+
+        query = f"SELECT record FROM {table}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY name, record_id LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def sync_offset(self, table):
+        return int(self.get_state(f'{table}:offset', 0))
+
+    def set_sync_offset(self, table, offset):
+        self.set_state(f'{table}:offset', offset)
+
+    def last_sync_time(self, table):
+        return float(self.get_state(f'{table}:last_sync', 0))
+
+    def mark_synced(self, table):
+        self.set_state(f'{table}:offset', 0)
+        self.set_state(f'{table}:last_sync', time.time())
+
+    def needs_sync(self, table, max_age):
+        """True while a sync is part way through or the last complete one is older than max_age"""
+        return self.sync_offset(table) > 0 or time.time() - self.last_sync_time(table) > max_age
@@ -0,0 +1,230 @@
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+import config
+
+
+class ResponseCache:
+    """
+    Two-tier TTL cache for API client responses.
+
+    The memory tier is an LRU bounded by max_entries. The disk tier keeps one
+    pickle per entry under cache_dir so responses survive a restart; it is
+    bounded by max_disk_entries, dropping the least recently written files.
+    """
+
+    def __init__(self, ttl=300, max_entries=256, cache_dir=None, max_disk_entries=2000, enabled=True):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.enabled = enabled
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if self.cache_dir and not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    @staticmethod
+    def make_key(namespace, method, params):
+        normalized = []
+        for name, value in sorted(params.items()):
+            if value is None or callable(value):
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            normalized.append((name, value))
+        return (namespace, method, tuple(normalized))
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{self._digest(key)}.pkl")
+
+    def get(self, key):
+        """
+        Look up a cached value
+
+        Returns:
+        - (True, value) on a hit, (False, None) on a miss or expired entry
+        """
+        if not self.enabled:
+            return False, None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return True, _copy_value(value)
+                del self._memory[key]
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as f:
+                    expires_at, stored_key, value = pickle.load(f)
+                if stored_key == key and expires_at > now:
+                    with self._lock:
+                        self._store_in_memory(key, expires_at, value)
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return True, _copy_value(value)
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error reading cache entry {path}: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def set(self, key, value, ttl=None):
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        value = _copy_value(value)
+
+        with self._lock:
+            self._store_in_memory(key, expires_at, value)
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), "wb") as f:
+                    pickle.dump((expires_at, key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+                self._prune_disk()
+            except Exception as e:
+                print(f"Error writing cache entry: {e}")
+
+    def _store_in_memory(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune_disk(self):
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".pkl")]
+        if len(entries) <= self.max_disk_entries:
+            return
+
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory)
+            }
+
+
+def _copy_value(value):
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _is_cacheable(value):
+    if value is None:
+        return False
+    if isinstance(value, pd.DataFrame):
+        return not value.empty
+    if isinstance(value, (dict, list)):
+        return len(value) > 0
+    return True
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                ttl=config.CACHE_DURATION,
+                max_entries=config.CACHE_MAX_ENTRIES,
+                cache_dir=os.path.join(os.getcwd(), config.CACHE_DIR),
+                max_disk_entries=config.CACHE_DISK_MAX_ENTRIES,
+                enabled=config.CACHE_ENABLED
+            )
+        return _shared_cache
+
+
+def cached(namespace, ttl=None):
+    """
+    Cache a client method's return value in the shared ResponseCache
+
+    The key is (namespace, method name, normalized call arguments). Empty
+    results are not cached, because the clients also return empty frames
+    when a request fails. Passing refresh=True skips the lookup and
+    replaces the cached value with a fresh call.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, refresh=False, **kwargs):
+            cache = get_shared_cache()
+            if not cache.enabled:
+                return method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            params.pop('self', None)
+            key = ResponseCache.make_key(namespace, method.__name__, params)
+
+            if not refresh:
+                found, value = cache.get(key)
+                if found:
+                    print(f"Cache hit for {namespace}.{method.__name__}")
+                    return value
+
+            value = method(self, *args, **kwargs)
+            if _is_cacheable(value):
+                cache.set(key, value, ttl=ttl)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,329 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from pyproj import CRS, Transformer
+
+import config
+
+
+def great_circle_paths(start_lons, start_lats, end_lons, end_lats, npoints=100):
+    """
+    Sample great-circle paths for many routes at once
+
+    Parameters:
+    - start_lons, start_lats, end_lons, end_lats: Arrays of endpoints in degrees
+    - npoints: Points per path, endpoints included
+
+    Returns:
+    - (lons, lats) arrays of shape (routes, npoints) in degrees
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(values, dtype=np.float64))
+                              for values in (start_lons, start_lats, end_lons, end_lats))
+
+    start = np.stack([np.cos(lat1) * np.cos(lon1), np.cos(lat1) * np.sin(lon1), np.sin(lat1)], axis=-1)
+    end = np.stack([np.cos(lat2) * np.cos(lon2), np.cos(lat2) * np.sin(lon2), np.sin(lat2)], axis=-1)
+
+    omega = np.arccos(np.clip(np.einsum('ij,ij->i', start, end), -1.0, 1.0))[:, None]
+    t = np.linspace(0.0, 1.0, npoints)[None, :]
+
+    sin_omega = np.sin(omega)
+    short = sin_omega < 1e-9
+    safe_sin = np.where(short, 1.0, sin_omega)
+    start_weight = np.where(short, 1.0 - t, np.sin((1.0 - t) * omega) / safe_sin)
+    end_weight = np.where(short, t, np.sin(t * omega) / safe_sin)
+
+    points = start_weight[..., None] * start[:, None, :] + end_weight[..., None] * end[:, None, :]
+    lons = np.degrees(np.arctan2(points[..., 1], points[..., 0]))
+    lats = np.degrees(np.arcsin(np.clip(points[..., 2] / np.linalg.norm(points, axis=-1), -1.0, 1.0)))
+    return lons, lats
+
+
+class MapProjector:
+    """
+    Projects lon/lat arrays into a Basemap's map coordinates
+
+    The Transformer is built from the Basemap's own projparams, which
+    include the false easting/northing that puts the lower-left corner at
+    (0, 0), so results match basemap(lon, lat) exactly while whole arrays
+    go through one PROJ call.
+    """
+
+    def __init__(self, basemap):
+        crs = CRS(basemap.projparams)
+        self.transformer = Transformer.from_crs(crs.geodetic_crs, crs, always_xy=True)
+
+    def __call__(self, lons, lats):
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        x, y = self.transformer.transform(lons.ravel(), lats.ravel())
+        return np.asarray(x).reshape(lons.shape), np.asarray(y).reshape(lats.shape)
+
+
+class RouteMapLayer:
+    """
+    Flight routes and airport markers on a Basemap axis, drawn as a few
+    batched artists
+
+    All routes live in one LineCollection and the airports in one scatter
+    per role, so adding routes only updates artist data. Routes can be
+    added in several batches as their endpoints become known. Projected
+    airport positions are kept in airport_xy for markers and labels.
+    Routes given a flight count are drawn thicker the busier they are.
+    """
+
+    def __init__(self, ax, basemap, npoints=100, label_limit=20):
+        self.ax = ax
+        self.basemap = basemap
+        self.npoints = npoints
+        self.label_limit = label_limit
+        self.project = MapProjector(basemap)
+        self.airport_xy = {}
+        self.plotted_airports = set()
+        self.route_count = 0
+        self.flight_count = 0
+
+        self._segments = []
+        self._linewidths = []
+        self._marker_xy = {'departure': [], 'arrival': []}
+        self._wrap_distance = (basemap.urcrnrx - basemap.llcrnrx) / 2
+
+        self.routes = LineCollection([], colors='blue', linewidths=1.5, alpha=0.7, zorder=4)
+        ax.add_collection(self.routes)
+        self.markers = {
+            'departure': ax.scatter([], [], s=36, c='r', alpha=0.8, zorder=5),
+            'arrival': ax.scatter([], [], s=36, c='g', alpha=0.8, zorder=5)
+        }
+        self._label_colors = {'departure': 'darkred', 'arrival': 'darkgreen'}
+
+    def _split_at_wraps(self, xs, ys):
+        """
+        Turn projected paths into line segments, cutting where a path wraps around the map edge
+
+        Returns:
+        - (segments, row of the path each segment came from)
+        """
+        wraps = np.abs(np.diff(xs, axis=1)) > self._wrap_distance
+        paths = np.stack([xs, ys], axis=-1)
+
+        unbroken = np.flatnonzero(~wraps.any(axis=1))
+        segments = list(paths[unbroken])
+        rows = list(unbroken)
+        for row in np.flatnonzero(wraps.any(axis=1)):
+            cuts = np.flatnonzero(wraps[row]) + 1
+            pieces = [piece for piece in np.split(paths[row], cuts) if len(piece) > 1]
+            segments.extend(pieces)
+            rows.extend([row] * len(pieces))
+        return segments, np.array(rows, dtype=np.int64)
+
+    @staticmethod
+    def route_widths(flights):
+        """Line width per route, growing with the log of its flight count"""
+        return np.minimum(1.5 + np.log2(np.maximum(flights, 1)), 6.0)
+
+    def add_routes(self, dep_names, dep_lats, dep_lons, arr_names, arr_lats, arr_lons, flights=None):
+        """
+        Draw a batch of routes, one per departure/arrival pair
+
+        flights optionally gives the number of flights on each route, which
+        sets its line width. Each airport gets a single marker in the role
+        it was first seen in, and the first label_limit airports are labelled.
+        """
+        if len(dep_names) == 0:
+            return
+
+        flights = np.ones(len(dep_names), dtype=np.int64) if flights is None else np.asarray(flights)
+
+        lons, lats = great_circle_paths(dep_lons, dep_lats, arr_lons, arr_lats, self.npoints)
+        xs, ys = self.project(lons, lats)
+        segments, rows = self._split_at_wraps(xs, ys)
+        self._segments.extend(segments)
+        self._linewidths.extend(self.route_widths(flights)[rows])
+        self.routes.set_segments(self._segments)
+        self.routes.set_linewidths(self._linewidths)
+        self.route_count += len(dep_names)
+        self.flight_count += int(flights.sum())
+
+        endpoints = (
+            ('departure', dep_names, xs[:, 0], ys[:, 0]),
+            ('arrival', arr_names, xs[:, -1], ys[:, -1])
+        )
+        for i in range(len(dep_names)):
+            for role, names, x, y in endpoints:
+                name = names[i]
+                if name in self.plotted_airports:
+                    continue
+
+                self.plotted_airports.add(name)
+                self.airport_xy[name] = (x[i], y[i])
+                self._marker_xy[role].append(self.airport_xy[name])
+
+                if len(self.plotted_airports) < self.label_limit:
+                    self.ax.annotate(
+                        name,
+                        xy=self.airport_xy[name],
+                        xytext=(5, 5),
+                        textcoords="offset points",
+                        fontsize=8,
+                        color=self._label_colors[role]
+                    )
+
+        for role, scatter in self.markers.items():
+            if self._marker_xy[role]:
+                scatter.set_offsets(np.array(self._marker_xy[role]))
+
+
+def format_parallel(lat):
+    if lat == 0:
+        return '0\N{DEGREE SIGN}'
+    return f"{abs(lat):g}\N{DEGREE SIGN}{'N' if lat > 0 else 'S'}"
+
+
+def format_meridian(lon):
+    if lon in (0, 180, -180):
+        return f"{abs(lon):g}\N{DEGREE SIGN}"
+    return f"{abs(lon):g}\N{DEGREE SIGN}{'E' if lon > 0 else 'W'}"
+
+
+class MapBackground:
+    """A Basemap projection and its rasterized coastlines, countries, continents and graticule"""
+
+    def __init__(self, basemap, image):
+        self.basemap = basemap
+        self.image = image
+
+    @property
+    def extent(self):
+        return (self.basemap.llcrnrx, self.basemap.urcrnrx, self.basemap.llcrnry, self.basemap.urcrnry)
+
+    def draw(self, ax, parallels=range(-60, 61, 30), meridians=range(-120, 121, 60)):
+        """
+        Show the background on ax and label the graticule along the left and bottom edges,
+        the way drawparallels/drawmeridians label a Robinson map
+        """
+        ax.imshow(self.image, extent=self.extent, origin='upper', interpolation='bilinear', zorder=0)
+        ax.set_xlim(self.basemap.llcrnrx, self.basemap.urcrnrx)
+        ax.set_ylim(self.basemap.llcrnry, self.basemap.urcrnry)
+        ax.set_aspect('equal')
+        ax.axis('off')
+
+        project = MapProjector(self.basemap)
+        lon_0 = self.basemap.projparams.get('lon_0', 0)
+
+        lats = np.array(list(parallels), dtype=np.float64)
+        xs, ys = project(np.full(len(lats), lon_0 - 180.0), lats)
+        for lat, x, y in zip(lats, xs, ys):
+            ax.text(x, y, format_parallel(lat) + ' ', ha='right', va='center', fontsize=10)
+
+        lons = np.array(list(meridians), dtype=np.float64)
+        xs, ys = project(lons, np.full(len(lons), -90.0))
+        for lon, x, y in zip(lons, xs, ys):
+            ax.text(x, y, format_meridian(lon), ha='center', va='top', fontsize=10)
+
+
+class MapBackgroundCache:
+    """
+    Memory and disk cache of pre-rendered map backgrounds
+
+    Building a Basemap and drawing its boundary data dominates route map
+    setup, so each (projection, resolution, figsize, dpi) combination is
+    built once, rasterized, and pickled under cache_dir. Later maps only
+    draw routes and markers over the cached image.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._memory = {}
+        self._lock = threading.Lock()
+
+        if self.cache_dir and not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def _disk_path(self, key):
+        projection, resolution, figsize, dpi = key
+        return os.path.join(self.cache_dir, f"{projection}_{resolution}_{figsize[0]:g}x{figsize[1]:g}_{dpi}.pkl")
+
+    def get(self, projection='robin', resolution='l', figsize=(12, 6), dpi=100):
+        key = (projection, resolution, tuple(figsize), dpi)
+        with self._lock:
+            background = self._memory.get(key)
+            if background is not None:
+                return background
+
+            background = self._load(key)
+            if background is None:
+                print(f"Rendering map background for {key}")
+                background = self._render(*key)
+                self._save(key, background)
+
+            self._memory[key] = background
+            return background
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                basemap, image = pickle.load(f)
+            return MapBackground(basemap, image)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading map background {path}: {e}")
+            return None
+
+    def _save(self, key, background):
+        if not self.cache_dir:
+            return
+        try:
+            with open(self._disk_path(key), "wb") as f:
+                pickle.dump((background.basemap, background.image), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Error writing map background: {e}")
+
+    @staticmethod
+    def _render(projection, resolution, figsize, dpi):
+        from mpl_toolkits.basemap import Basemap
+
+        basemap = Basemap(projection=projection, lon_0=0, resolution=resolution)
+        # Drawing attaches artists to the Basemap, so keep an undrawn copy for the cache
+        clean_basemap = pickle.dumps(basemap, protocol=pickle.HIGHEST_PROTOCOL)
+
+        width = figsize[0]
+        height = width * (basemap.urcrnry - basemap.llcrnry) / (basemap.urcrnrx - basemap.llcrnrx)
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 1])
+
+        basemap.drawmapboundary(fill_color='white', ax=ax)
+        basemap.fillcontinents(color='lightgray', lake_color='white', ax=ax)
+        basemap.drawcoastlines(linewidth=0.5, ax=ax)
+        basemap.drawcountries(linewidth=0.5, ax=ax)
+        basemap.drawparallels(np.arange(-90., 91., 30.), ax=ax)
+        basemap.drawmeridians(np.arange(-180., 181., 60.), ax=ax)
+
+        ax.set_xlim(basemap.llcrnrx, basemap.urcrnrx)
+        ax.set_ylim(basemap.llcrnry, basemap.urcrnry)
+        ax.axis('off')
+        fig.patch.set_alpha(0)
+
+        canvas.draw()
+        image = np.asarray(canvas.buffer_rgba()).copy()
+        return MapBackground(pickle.loads(clean_basemap), image)
+
+
+_shared_backgrounds = None
+_shared_backgrounds_lock = threading.Lock()
+
+
+def get_map_background_cache():
+    global _shared_backgrounds
+    with _shared_backgrounds_lock:
+        if _shared_backgrounds is None:
+            _shared_backgrounds = MapBackgroundCache(os.path.join(os.getcwd(), config.CACHE_DIR, "map_backgrounds"))
+        return _shared_backgrounds
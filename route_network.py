@@ -0,0 +1,162 @@
+import threading
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+import config
+
+
+def aggregate_routes(origins, destinations):
+    """
+    Group flights by origin/destination pair
+
+    Parameters:
+    - origins, destinations: Equal-length sequences of airport codes or names
+
+    Returns:
+    - (origins, destinations, counts) arrays with one entry per distinct
+      route, busiest route first
+    """
+    origins = np.asarray(origins, dtype=str)
+    destinations = np.asarray(destinations, dtype=str)
+    if len(origins) == 0:
+        return np.array([], dtype=object), np.array([], dtype=object), np.array([], dtype=np.int64)
+
+    codes, inverse = np.unique(np.concatenate([origins, destinations]), return_inverse=True)
+    pair_ids = inverse[:len(origins)].astype(np.int64) * len(codes) + inverse[len(origins):]
+    pairs, counts = np.unique(pair_ids, return_counts=True)
+
+    order = np.argsort(-counts, kind='stable')
+    pairs = pairs[order]
+    codes = codes.astype(object)
+    return codes[pairs // len(codes)], codes[pairs % len(codes)], counts[order].astype(np.int64)
+
+
+class RouteNetwork:
+    """
+    Weighted origin-destination matrix of airports built from flight records
+
+    Flights are counted once per (flight_date, flight number), so feeding
+    in overlapping snapshots of the same board only adds the flights that
+    are new. The matrix and the directed route graph are updated in place;
+    betweenness is only recomputed when a new route appears, since added
+    flights on a known route don't change the graph's shape.
+    """
+
+    def __init__(self):
+        self.airports = []
+        self.matrix = np.zeros((0, 0), dtype=np.int64)
+        self.graph = nx.DiGraph()
+        self.flight_count = 0
+
+        self._positions = {}
+        self._seen_flights = set()
+        self._betweenness = None
+        self._lock = threading.Lock()
+
+    def _grow(self, codes):
+        new_codes = [code for code in codes if code not in self._positions]
+        if not new_codes:
+            return
+
+        for code in new_codes:
+            self._positions[code] = len(self.airports)
+            self.airports.append(code)
+
+        size = len(self.airports)
+        grown = np.zeros((size, size), dtype=np.int64)
+        grown[:self.matrix.shape[0], :self.matrix.shape[1]] = self.matrix
+        self.matrix = grown
+
+    def add_flights(self, flight_data):
+        """
+        Count flights that have not been seen before into the network
+
+        Returns:
+        - Number of flights added
+        """
+        required_cols = ['departure_iata', 'arrival_iata']
+        if flight_data.empty or any(col not in flight_data.columns for col in required_cols):
+            return 0
+
+        data = flight_data.dropna(subset=required_cols)
+        data = data[(data['departure_iata'] != '') & (data['arrival_iata'] != '')]
+        if data.empty:
+            return 0
+
+        # Flights without a flight number are told apart by route and scheduled departure
+        fallback_ids = (data['departure_iata'].astype(str) + '>' + data['arrival_iata'].astype(str) + '@'
+                        + data.reindex(columns=['departure_scheduled'])['departure_scheduled'].astype(str))
+        flight_ids = data.reindex(columns=['flight_iata'])['flight_iata']
+        if 'flight_icao' in data.columns:
+            flight_ids = flight_ids.fillna(data['flight_icao'])
+        keys = data.reindex(columns=['flight_date'])['flight_date'].astype(str) + '|' + flight_ids.fillna(fallback_ids).astype(str)
+
+        with self._lock:
+            fresh = ~keys.isin(self._seen_flights) & ~keys.duplicated()
+            new_flights = data[fresh]
+            if new_flights.empty:
+                return 0
+
+            origins, destinations, counts = aggregate_routes(new_flights['departure_iata'], new_flights['arrival_iata'])
+            self._grow(np.unique(np.concatenate([origins, destinations]).astype(str)))
+
+            rows = np.array([self._positions[code] for code in origins])
+            cols = np.array([self._positions[code] for code in destinations])
+            self.matrix[rows, cols] += counts
+
+            for origin, destination, count in zip(origins, destinations, counts):
+                if self.graph.has_edge(origin, destination):
+                    self.graph[origin][destination]['weight'] += int(count)
+                else:
+                    self.graph.add_edge(origin, destination, weight=int(count))
+                    self._betweenness = None
+
+            self._seen_flights.update(keys[fresh])
+            self.flight_count += len(new_flights)
+
+        return len(new_flights)
+
+    def _betweenness_centrality(self):
+        if self._betweenness is None:
+            samples = config.ROUTE_BETWEENNESS_SAMPLES
+            if self.graph.number_of_nodes() > samples:
+                self._betweenness = nx.betweenness_centrality(self.graph, k=samples, seed=0)
+            else:
+                self._betweenness = nx.betweenness_centrality(self.graph)
+        return self._betweenness
+
+    def airport_metrics(self):
+        """
+        Per-airport traffic and centrality, ranked as hubs
+
+        Airports are ranked by flights, then by the number of airports
+        they connect to, then by betweenness.
+
+        Returns:
+        - DataFrame with airport, departures, arrivals, flights, connections,
+          betweenness and hub_rank, best hub first
+        """
+        with self._lock:
+            departures = self.matrix.sum(axis=1)
+            arrivals = self.matrix.sum(axis=0)
+            linked = self.matrix > 0
+            connections = (linked | linked.T).sum(axis=1)
+            centrality = self._betweenness_centrality()
+            betweenness = np.array([centrality.get(code, 0.0) for code in self.airports], dtype=np.float64)
+            airports = list(self.airports)
+
+        flights = departures + arrivals
+        order = np.lexsort((-betweenness, -connections, -flights))
+
+        metrics = pd.DataFrame({
+            'airport': np.array(airports, dtype=object)[order] if airports else [],
+            'departures': departures[order],
+            'arrivals': arrivals[order],
+            'flights': flights[order],
+            'connections': connections[order],
+            'betweenness': betweenness[order].round(4)
+        })
+        metrics['hub_rank'] = np.arange(1, len(metrics) + 1)
+        return metrics
@@ -0,0 +1,24 @@
+class SyncStateMixin:
+    """
+    Key/value sync bookkeeping for the SQLite stores
+
+    Expects the class to set self._connection and self._lock, and to call
+    _create_sync_state_table() while creating its own tables.
+    """
+
+    def _create_sync_state_table(self):
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+    def get_state(self, key, default=None):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key, value):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                (key, str(value))
+            )